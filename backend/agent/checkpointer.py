@@ -0,0 +1,222 @@
+"""
+Batching MongoDB checkpointer.
+
+MongoDBSaver writes one checkpoint document per node transition, so a single
+turn (detect_intent -> subgraph -> chat_node -> tools -> chat_node) issues
+several separate update_one round-trips. BatchingMongoDBSaver buffers those
+upserts and sends them as one unordered bulk_write when the turn (graph run)
+ends, or earlier if anything reads from the checkpoint collection.
+
+Alongside each top-level checkpoint it also upserts a small per-thread
+preview (title, last message, message count, timestamps) into the sessions
+collection, so the sessions API can list threads without deserializing
+their checkpoints.
+"""
+
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from langchain_core.messages import HumanMessage, HumanMessageChunk
+from langgraph.checkpoint.mongodb import MongoDBSaver
+from langgraph.graph.state import CompiledStateGraph
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+
+_HUMAN_TYPES = frozenset({HumanMessage, HumanMessageChunk})
+
+
+def _is_human(m: Any) -> bool:
+    """True for a user turn: a HumanMessage, a message of type "human", or a {"role": "user"} dict."""
+    if type(m) in _HUMAN_TYPES:
+        return True
+    if isinstance(m, dict):
+        return m.get("role") == "user"
+    return getattr(m, "type", None) == "human" or getattr(m, "role", None) == "user"
+
+
+def _content(m: Any) -> Optional[str]:
+    """A message's content as text (None if it has none)."""
+    if isinstance(m, dict):
+        return str(m.get("content", ""))
+    content = getattr(m, "content", None)
+    return None if content is None else str(content)
+
+
+def session_preview(messages: Sequence[Any], metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Title, last message snippet and message count for a thread's messages."""
+    # Extract last message
+    last_message = None
+    if messages:
+        content = _content(messages[-1])
+        if content is not None:
+            last_message = content[:100]
+    
+    # Extract title from metadata or first user message
+    title = metadata.get("title")
+    if not title and messages:
+        first_user_msg = next((m for m in messages if _is_human(m)), None)
+        content = _content(first_user_msg) if first_user_msg is not None else None
+        if content:
+            # Clean and truncate title
+            title = content.replace('\n', ' ').strip()[:50]
+            if len(content) > 50:
+                title = title.rsplit(' ', 1)[0] + '...'  # Don't cut words
+    
+    return {"title": title, "last_message": last_message, "message_count": len(messages)}
+
+
+class _BufferedCheckpointCollection:
+    """
+    Wraps the checkpoint collection so MongoDBSaver.put's upserts are buffered.
+    Any other collection access flushes pending upserts first, so reads always
+    see every checkpoint written so far.
+    """
+
+    def __init__(self, collection, saver: "BatchingMongoDBSaver"):
+        self._collection = collection
+        self._saver = saver
+
+    def update_one(self, filter, update, upsert=False, **kwargs):
+        if not upsert or kwargs:
+            self._saver.flush()
+            return self._collection.update_one(filter, update, upsert=upsert, **kwargs)
+        self._saver._buffer(filter, update)
+        return None
+
+    def __getattr__(self, name):
+        self._saver.flush()
+        return getattr(self._collection, name)
+
+
+class BatchingMongoDBSaver(MongoDBSaver):
+    """
+    MongoDBSaver that coalesces checkpoint upserts into bulk writes.
+
+    Pending upserts are flushed:
+    - at the end of each graph run (see CheckpointFlushingGraph),
+    - when max_batch_size upserts are pending,
+    - before any read from the checkpoint collection (get_tuple, list, ...),
+    - on flush() / aflush() (e.g. before deleting sessions, application shutdown).
+
+    Session previews are written in the same flush, after the checkpoints.
+    Upserts leave the buffer only once their bulk_write succeeds; after a
+    failure they stay pending and are retried by the next flush.
+    One instance is shared per process (agent.graph.get_checkpointer_sync), so
+    every reader flushes the same buffer the graph writes to.
+
+    Durability trade-off (intended): checkpoints live only in memory until the
+    turn ends, while put_writes still goes to MongoDB immediately. If the
+    process dies mid-turn, that turn's checkpoints are lost and its pending
+    writes are left without a checkpoint; the thread resumes from the last
+    flushed turn and the orphaned writes are never read.
+    """
+
+    def __init__(
+        self,
+        *args,
+        max_batch_size: int = 50,
+        sessions_collection_name: str = "sessions",
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.max_batch_size = max_batch_size
+        # Keyed by (thread_id, checkpoint_ns, checkpoint_id); a re-put of the
+        # same checkpoint replaces the earlier upsert
+        self._pending: Dict[Tuple[Any, ...], UpdateOne] = {}
+        # Latest preview per thread_id; only the newest checkpoint's survives
+        self._pending_previews: Dict[str, UpdateOne] = {}
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._raw_checkpoint_collection = self.checkpoint_collection
+        self.sessions_collection = self._raw_checkpoint_collection.database[sessions_collection_name]
+        self.checkpoint_collection = _BufferedCheckpointCollection(self.checkpoint_collection, self)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+        configurable = config["configurable"]
+        if not configurable.get("checkpoint_ns", ""):
+            self._buffer_preview(configurable["thread_id"], checkpoint, metadata or {})
+        return next_config
+
+    def _buffer_preview(self, thread_id: str, checkpoint: Dict[str, Any], metadata: Dict[str, Any]):
+        """Queue the sessions-collection upsert for a thread's newest top-level checkpoint."""
+        messages = (checkpoint.get("channel_values") or {}).get("messages") or []
+        ts = datetime.fromisoformat(checkpoint["ts"])
+        preview = session_preview(messages, metadata)
+        preview["updated_at"] = ts
+        op = UpdateOne(
+            {"thread_id": thread_id},
+            {"$set": preview, "$setOnInsert": {"created_at": ts}},
+            upsert=True,
+        )
+        with self._pending_lock:
+            self._pending_previews[thread_id] = op
+
+    def _buffer(self, filter: Dict[str, Any], update: Dict[str, Any]):
+        key = tuple(sorted(filter.items()))
+        with self._pending_lock:
+            self._pending[key] = UpdateOne(filter, update, upsert=True)
+            full = len(self._pending) >= self.max_batch_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write all pending checkpoint upserts in a single bulk_write, then the previews."""
+        # Serialize flushes so an older batch never lands after a newer one
+        with self._flush_lock:
+            with self._pending_lock:
+                ops = dict(self._pending)
+                preview_ops = dict(self._pending_previews)
+            if ops:
+                self._raw_checkpoint_collection.bulk_write(list(ops.values()), ordered=False)
+                self._discard(self._pending, ops)
+                logger.debug("Flushed %d checkpoint upsert(s)", len(ops))
+            # After the checkpoints, so a listed session always has its checkpoint
+            if preview_ops:
+                self.sessions_collection.bulk_write(list(preview_ops.values()), ordered=False)
+                self._discard(self._pending_previews, preview_ops)
+
+    def _discard(self, pending: Dict[Any, UpdateOne], written: Dict[Any, UpdateOne]):
+        """Drop written upserts from a buffer, keeping any that were replaced while writing."""
+        with self._pending_lock:
+            for key, op in written.items():
+                if pending.get(key) is op:
+                    del pending[key]
+
+    async def aflush(self):
+        """Async variant of flush(); runs the bulk write in a worker thread."""
+        await asyncio.to_thread(self.flush)
+
+
+class CheckpointFlushingGraph(CompiledStateGraph):
+    """
+    Compiled graph that flushes its BatchingMongoDBSaver when a run ends.
+
+    invoke/ainvoke and astream_events all go through stream/astream, so each
+    turn's checkpoints are written once the turn completes, fails or is
+    interrupted. A failed flush is logged and its upserts stay pending.
+    """
+
+    def stream(self, *args, **kwargs):
+        try:
+            yield from super().stream(*args, **kwargs)
+        finally:
+            try:
+                self.checkpointer.flush()
+            except Exception as e:
+                logger.error("Failed to flush checkpoints at end of turn: %s", e, exc_info=True)
+
+    async def astream(self, *args, **kwargs):
+        try:
+            async for chunk in super().astream(*args, **kwargs):
+                yield chunk
+        finally:
+            try:
+                await self.checkpointer.aflush()
+            except Exception as e:
+                logger.error("Failed to flush checkpoints at end of turn: %s", e, exc_info=True)
@@ -7,13 +7,29 @@ from typing import cast, Optional
 from langchain_core.messages import AIMessage, ToolMessage, HumanMessage
 from langgraph.graph import StateGraph, START, END
 from langgraph.prebuilt import ToolNode
-from langgraph.checkpoint.mongodb import MongoDBSaver
+from langgraph.checkpoint.memory import MemorySaver
 from pymongo import MongoClient  # MongoDBSaver requires synchronous pymongo client
 import os
+import re
+import asyncio
+import functools
 from langchain_core.runnables import RunnableConfig
 from copilotkit.langgraph import copilotkit_emit_message
 import logging
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+
+    def _json_dumps_sorted(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS).decode()
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    import json
+    _json_loads = json.loads
+
+    def _json_dumps_sorted(obj) -> str:
+        return json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
 # Import context variable for Sasai token
 # We MUST use the same ContextVar instance from app.context, otherwise the token won't be accessible
 from app.context import sasai_token_context
@@ -23,30 +39,43 @@ logger = logging.getLogger(__name__)
 # Import Ecocash chat node
 from engine.chat import chat_node
 from engine.state import AgentState
+from agent.checkpointer import BatchingMongoDBSaver, CheckpointFlushingGraph
 
 # Import Ecocash tools
 # Import MCP Client
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.sse import sse_client
 from langchain_mcp_adapters.tools import load_mcp_tools
+from utils.mcp_client_utils import get_mcp_session, call_mcp_tool
+from utils import mcp_client_utils
 
 # We will load tools dynamically from MCP server
 # from agent.tools import get_balance, list_transactions, create_ticket, get_transaction_details, get_cash_flow_overview, get_incoming_insights, get_investment_insights, get_spends_insights
 
 # Import workflow subgraphs
-from agent.workflows.subgraphs import detect_workflow_intent, get_workflow_subgraph
-from agent.workflows.subgraphs.transaction_help_graph import build_transaction_help_subgraph
-from agent.workflows.subgraphs.refund_graph import build_refund_subgraph
-from agent.workflows.subgraphs.loan_enquiry_graph import build_loan_enquiry_graph
-from agent.workflows.subgraphs.card_issue_graph import build_card_issue_subgraph
-from agent.workflows.subgraphs.general_enquiry_graph import build_general_enquiry_subgraph
-from agent.workflows.subgraphs.financial_insights_graph import build_financial_insights_subgraph
+from agent.workflows.subgraphs import detect_workflow_intent, compile_workflow_subgraphs
+
+# Workflows with a summarization subgraph, run by dispatch_workflow_node
+WORKFLOWS = ("transaction_help", "financial_insights", "refund", "loan_enquiry", "card_issue", "general_enquiry")
+
+# Settings read once at import time instead of on every request (see refresh_env())
+USE_TOKEN_MANAGER = os.getenv("USE_TOKEN_MANAGER", "true").lower() == "true"
+_TICKET_RE = re.compile(r'TICKET-\d+')
+
+# User responses to the ticket confirmation dialog
+_CONFIRM_PREFIX = "CONFIRM"
+_CANCEL = "CANCEL"
+
+
+def refresh_env():
+    """Re-read environment-driven settings (token manager flag and MCP server URL)."""
+    global USE_TOKEN_MANAGER
+    USE_TOKEN_MANAGER = os.getenv("USE_TOKEN_MANAGER", "true").lower() == "true"
+    mcp_client_utils.refresh_env()
 
 # Node for ticket confirmation (human-in-the-loop)
 async def ticket_confirmation_node(state: AgentState, config: RunnableConfig):
     """Shows confirmation dialog and waits for user response."""
     thread_id = config.get("configurable", {}).get("thread_id", "NO_THREAD_ID")
-    print(f"[TICKET_CONFIRMATION] Node executed with thread_id: {thread_id}")
+    logger.debug("[TICKET_CONFIRMATION] Node executed with thread_id: %s", thread_id)
     return state
 
 # Node to perform ticket creation after confirmation
@@ -54,105 +83,77 @@ async def perform_ticket_node(state: AgentState, config: RunnableConfig):
     """Execute ticket creation after user confirmation."""
     messages = state.get("messages", [])
     
-    # Get the tool message (user's confirmation response)
+    # Single reverse pass for the user's confirmation response (last ToolMessage)
+    # and the AI message holding the tool call
     tool_message = None
-    for msg in reversed(messages):
-        if isinstance(msg, ToolMessage):
-            tool_message = msg
-            break
-    
-    # Get the AI message with tool call
     ai_message = None
     for msg in reversed(messages):
-        if isinstance(msg, AIMessage) and msg.tool_calls:
+        if tool_message is None and isinstance(msg, ToolMessage):
+            tool_message = msg
+        elif ai_message is None and isinstance(msg, AIMessage) and msg.tool_calls:
             ai_message = msg
+        if tool_message and ai_message:
             break
     
     if tool_message and ai_message:
         # Check if user cancelled
-        if tool_message.content == "CANCEL":
+        if tool_message.content == _CANCEL:
             logger.info("Ticket creation cancelled by user")
             cancel_msg = AIMessage(content="Ticket creation cancelled. Is there anything else I can help you with?")
-            state["messages"].append(cancel_msg)
             await copilotkit_emit_message(config, cancel_msg.content)
-            return state
+            return {"messages": [cancel_msg]}
         
         # User confirmed - proceed with ticket creation
-        if tool_message.content == "CONFIRM" or tool_message.content.startswith("CONFIRM"):
+        if tool_message.content.startswith(_CONFIRM_PREFIX):
             logger.info("Ticket creation confirmed, executing create_ticket tool")
             try:
-                # Execute the actual ticket creation via MCP
-                mcp_url = os.getenv("MCP_SERVER_URL", "http://localhost:8001/mcp")
-                
-                async with sse_client(mcp_url) as (read, write):
-                    async with ClientSession(read, write) as session:
-                        await session.initialize()
-                        
-                        # Find the last AIMessage with tool_calls
-                        original_tool_call = None
-                        for msg in reversed(messages):
-                            if isinstance(msg, AIMessage) and msg.tool_calls:
-                                for tc in msg.tool_calls:
-                                    if tc["name"] == "create_ticket":
-                                        original_tool_call = tc
-                                        break
-                                if original_tool_call:
-                                    break
-                        
-                        if original_tool_call:
-                            result = await session.call_tool("create_ticket", arguments=original_tool_call["args"])
-                            # Extract text content from result
-                            ticket_result = ""
-                            if result.content:
-                                for item in result.content:
-                                    if item.type == "text":
-                                        ticket_result += item.text
-                            if not ticket_result:
-                                ticket_result = "Ticket created."
-                            
-                            # Create ToolMessage
-                            tool_msg = ToolMessage(
-                                tool_call_id=original_tool_call["id"],
-                                name="create_ticket",
-                                content=ticket_result
-                            )
-                            
-                            # We need to return state update
-                            result_state = state.copy()
-                            result_state["messages"].append(tool_msg)
-                        else:
-                            raise Exception("Could not find original ticket creation request")
-                
-                # Get the ticket result
-                tool_messages = [msg for msg in result_state.get("messages", []) if isinstance(msg, ToolMessage)]
-                if tool_messages:
-                    ticket_result = tool_messages[-1].content
-                    
-                    # Extract ticket ID from the result (format: "Support ticket TICKET-12345 created...")
-                    import re
-                    ticket_id_match = re.search(r'TICKET-\d+', ticket_result)
-                    ticket_id = ticket_id_match.group(0) if ticket_id_match else "N/A"
-                    
-                    logger.info(f"Ticket created successfully: {ticket_id}")
+                # Execute the actual ticket creation via the pooled MCP session
+                original_tool_call = next(
+                    (tc for tc in ai_message.tool_calls if tc["name"] == "create_ticket"), None
+                )
+
+                if original_tool_call:
+                    result = await call_mcp_tool("create_ticket", original_tool_call["args"])
+                    # Extract text content from result
+                    ticket_result = "".join(item.text for item in (result.content or []) if item.type == "text")
+                    if not ticket_result:
+                        ticket_result = "Ticket created."
                     
-                    # Create a clear success message with prominent ticket ID
-                    success_msg = AIMessage(
-                        content=f"✅ Your support request has been successfully submitted!\n\n"
-                               f"📋 Ticket ID: {ticket_id}\n\n"
-                               f"Please save this ticket ID for your records. You can use it to track the status of your request. "
-                               f"Our support team will review your request and get back to you shortly. "
-                               f"Is there anything else I can help you with?"
+                    # Create ToolMessage
+                    tool_msg = ToolMessage(
+                        tool_call_id=original_tool_call["id"],
+                        name="create_ticket",
+                        content=ticket_result
                     )
-                    result_state["messages"].append(success_msg)
-                    await copilotkit_emit_message(config, success_msg.content)
+                    
+                    # Partial update; the add_messages reducer appends to the history
+                    new_messages = [tool_msg]
+                else:
+                    raise Exception("Could not find original ticket creation request")
+                
+                # Extract ticket ID from the result (format: "Support ticket TICKET-12345 created...")
+                ticket_id_match = _TICKET_RE.search(ticket_result)
+                ticket_id = ticket_id_match.group(0) if ticket_id_match else "N/A"
+                
+                logger.info(f"Ticket created successfully: {ticket_id}")
+                
+                # Create a clear success message with prominent ticket ID
+                success_msg = AIMessage(
+                    content=f"✅ Your support request has been successfully submitted!\n\n"
+                           f"📋 Ticket ID: {ticket_id}\n\n"
+                           f"Please save this ticket ID for your records. You can use it to track the status of your request. "
+                           f"Our support team will review your request and get back to you shortly. "
+                           f"Is there anything else I can help you with?"
+                )
+                new_messages.append(success_msg)
+                await copilotkit_emit_message(config, success_msg.content)
                 
-                return result_state
+                return {"messages": new_messages}
             except Exception as e:
                 logger.error(f"Failed to create ticket: {e}", exc_info=True)
                 error_msg = AIMessage(content="I encountered an error while creating your ticket. Please try again or contact support directly.")
-                state["messages"].append(error_msg)
                 await copilotkit_emit_message(config, error_msg.content)
-                return state
+                return {"messages": [error_msg]}
     
     return state
 
@@ -162,14 +163,14 @@ async def detect_intent_node(state: AgentState, config: RunnableConfig):
     Only detects intent if no workflow is currently active.
     """
     thread_id = config.get("configurable", {}).get("thread_id", "NO_THREAD_ID")
-    print(f"[DETECT_INTENT] Node executed with thread_id: {thread_id}")
+    logger.debug("[DETECT_INTENT] Node executed with thread_id: %s", thread_id)
     
     messages = state.get("messages", [])
-    user_messages = [msg for msg in messages if isinstance(msg, HumanMessage)]
+    # Last user message (HumanMessage), or None for a new session
+    last_user_message = next((msg for msg in reversed(messages) if isinstance(msg, HumanMessage)), None)
     
     # If this is a new session (no user messages), send welcome message first
-    if len(user_messages) == 0:
-        from copilotkit.langgraph import copilotkit_emit_message
+    if last_user_message is None:
         welcome_msg = "How can I help you today?"
         welcome_ai_msg = AIMessage(content=welcome_msg)
         state["messages"].append(welcome_ai_msg)
@@ -180,30 +181,24 @@ async def detect_intent_node(state: AgentState, config: RunnableConfig):
     # Only detect intent if no workflow is already active
     current_workflow = state.get("current_workflow")
     if current_workflow:
-        logger.debug(f"Intent detection skipped: workflow '{current_workflow}' already active")
+        logger.debug("Intent detection skipped: workflow '%s' already active", current_workflow)
         return state
-    if messages:
-        # Get the last user message (HumanMessage)
-        last_user_message = None
-        for msg in reversed(messages):
-            if isinstance(msg, HumanMessage):
-                last_user_message = msg
-                break
-        
-        if last_user_message:
-            user_message = str(last_user_message.content) if hasattr(last_user_message, 'content') else ""
-            if user_message:
-                logger.debug(f"Detecting workflow intent from user message: {user_message[:100]}...")
-                workflow_name = detect_workflow_intent(user_message)
-                if workflow_name:
-                    # 🎯 LOG 2: Intent Detected
-                    logger.info(f"🟢 [2/4] INTENT DETECTED: '{workflow_name}'")
-                    state["current_workflow"] = workflow_name
-                    return state
-                else:
-                    # 🎯 LOG 2: No specific intent, general chat
-                    logger.info(f"🟢 [2/4] INTENT DETECTED: 'general_chat' (no specific workflow)")
-                    logger.debug("No workflow intent detected, routing to chat_node")
+    user_message = str(last_user_message.content) if hasattr(last_user_message, 'content') else ""
+    if user_message:
+        logger.debug("Detecting workflow intent from user message: %.100s...", user_message)
+        workflow_name = detect_workflow_intent(user_message)
+        if workflow_name:
+            # 🎯 LOG 2: Intent Detected
+            logger.info("🟢 [2/4] INTENT DETECTED: '%s'", workflow_name)
+            state["current_workflow"] = workflow_name
+            return state
+        else:
+            # 🎯 LOG 2: No specific intent, general chat
+            logger.info("🟢 [2/4] INTENT DETECTED: 'general_chat' (no specific workflow)")
+            # Answer in this node rather than routing to chat_node, saving a graph
+            # hop and a checkpoint write on every general-chat turn
+            logger.debug("No workflow intent detected, running chat_node inline")
+            return await chat_node(state, config)
     return state
 
 # ----------------------------------------------------------------------
@@ -218,17 +213,11 @@ graph_builder.add_node("detect_intent", detect_intent_node)
 
 # Define a function to get tools from MCP server
 async def get_remittance_tools():
-    # Connect to MCP server via SSE
-    # Note: In a real production app, you might want to manage the connection lifecycle better
-    # For this implementation, we'll assume the server is running at the default URL
-    mcp_url = os.getenv("MCP_SERVER_URL", "http://localhost:8001/mcp")
-    
-    async with sse_client(mcp_url) as (read, write):
-        async with ClientSession(read, write) as session:
-            await session.initialize()
-            # Load tools from MCP server
-            tools = await load_mcp_tools(session)
-            return tools
+    # Reuse the pooled MCP session (connected and initialized once per process)
+    session = await get_mcp_session()
+    # Load tools from MCP server
+    tools = await load_mcp_tools(session)
+    return tools
 
 # Since we can't easily make the ToolNode async at build time in this structure,
 # we might need to wrap it or initialize it differently.
@@ -238,6 +227,17 @@ async def get_remittance_tools():
 # For now, let's try to load them if we are in an async context, or define a node that loads them.
 
 # Alternative: Define a node that executes tools using the MCP client directly
+
+# Ordered (container, keys) lookup table for extract_token_from_config
+_TOKEN_KEYS = ("external_token", "sasai_token", "sasaiToken", "token", "auth_token")
+_TOKEN_LOOKUP = (
+    ("configurable", _TOKEN_KEYS),
+    ("tags", _TOKEN_KEYS[:3]),
+    ("metadata", _TOKEN_KEYS[:3]),
+)
+_EMPTY: dict = {}  # shared default, never written to
+
+
 def extract_token_from_config(config: RunnableConfig) -> Optional[str]:
     """
     Extract Sasai authentication token from LangGraph config.
@@ -251,37 +251,139 @@ def extract_token_from_config(config: RunnableConfig) -> Optional[str]:
     Returns:
         Token string if found, None otherwise
     """
-    # Check configurable metadata
-    configurable = config.get("configurable", {})
-    
-    # Check for token in various possible locations
+    # Check for token in various possible locations, first hit wins
     # Priority: external_token > sasai_token > token > auth_token
-    token = (
-        configurable.get("external_token") or
-        configurable.get("sasai_token") or
-        configurable.get("sasaiToken") or
-        configurable.get("token") or
-        configurable.get("auth_token") or
-        config.get("tags", {}).get("external_token") or
-        config.get("tags", {}).get("sasai_token") or
-        config.get("tags", {}).get("sasaiToken") or
-        config.get("metadata", {}).get("external_token") or
-        config.get("metadata", {}).get("sasai_token") or
-        config.get("metadata", {}).get("sasaiToken")
-    )
+    token = None
+    for container, keys in _TOKEN_LOOKUP:
+        sub = config.get(container) or _EMPTY
+        if not isinstance(sub, dict):
+            # e.g. tags is normally a list of strings
+            continue
+        for key in keys:
+            token = sub.get(key)
+            if token:
+                break
+        if token:
+            break
     
     # If token is in "Bearer <token>" format, extract just the token
     if token and isinstance(token, str) and token.startswith("Bearer "):
         token = token.replace("Bearer ", "").strip()
     
     if token:
-        logger.debug(f"[TOKEN_EXTRACT] Found external token (preview): {token[:20]}...")
+        logger.debug("[TOKEN_EXTRACT] Found external token (preview): %.20s...", token)
     else:
         logger.debug("[TOKEN_EXTRACT] No external token found in config")
     
     return token
 
 
+def _canonical_tool_content(content: str) -> str:
+    """
+    Make JSON tool output deterministic before it goes into the message history.
+    
+    ToolMessage content is re-sent to the LLM on every later turn, so it must be
+    byte-stable across equivalent tool invocations to keep the provider's prompt
+    prefix cache warm. Server-injected timestamps are dropped and keys sorted;
+    non-JSON content is returned unchanged.
+    """
+    if content.lstrip()[:1] not in ("{", "["):
+        return content
+    try:
+        parsed = _json_loads(content)
+    except ValueError:
+        return content
+    if isinstance(parsed, dict):
+        parsed.pop("timestamp", None)
+        metadata = parsed.get("metadata")
+        if isinstance(metadata, dict):
+            metadata.pop("timestamp", None)
+    return _json_dumps_sorted(parsed)
+
+
+# Read-only MCP tools, safe to re-send after a dropped connection; anything
+# else (e.g. create_ticket) could run twice, so it is never retried
+_RETRYABLE_MCP_TOOLS = frozenset({
+    "get_balance", "list_transactions", "get_ticket_status", "get_wallet_transaction_history"
+})
+
+
+async def _invoke_mcp_tool(tool_call: dict, external_token: Optional[str], use_token_manager: bool) -> ToolMessage:
+    """Run a single tool call on the MCP server and wrap the result in a ToolMessage."""
+    tool_name = tool_call["name"]
+    tool_args = tool_call["args"].copy() if tool_call["args"] else {}
+    
+    logger.debug("[MCP_TOOL] Processing tool: %s", tool_name)
+    
+    # ALWAYS inject external_token if provided (takes precedence over token manager)
+    # If token manager is disabled, external_token is required
+    if external_token:
+        tool_args["external_token"] = external_token
+        logger.info("[MCP_TOOL] ✅ Injected external_token for %s (preview: %.20s...)", tool_name, external_token)
+    elif not use_token_manager:
+        logger.error("[MCP_TOOL] ❌ Token manager disabled but no external_token provided for %s", tool_name)
+        # Don't inject None - let the tool handle the error
+    else:
+        logger.debug("[MCP_TOOL] No external token, will use token manager for %s", tool_name)
+    
+    try:
+        # Call the tool on the MCP server
+        # 🎯 LOG 4: Tool Call
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "🟠 [4/4] TOOL CALL: %s(%s)",
+                tool_name,
+                ", ".join(f"{k}={v}" for k, v in tool_args.items() if k != "external_token"),
+            )
+        
+        async def on_progress(progress: float, total: Optional[float], message: Optional[str]):
+            logger.debug("[MCP_TOOL] %s progress: %s/%s %s", tool_name, progress, total, message or "")
+        
+        result = await call_mcp_tool(
+            tool_name, tool_args, progress_callback=on_progress, retry=tool_name in _RETRYABLE_MCP_TOOLS
+        )
+        
+        # Log the raw MCP result structure
+        logger.info("[MCP_TOOL] Tool: %s", tool_name)
+        logger.info("[MCP_TOOL] Result type: %s", type(result))
+        logger.info("[MCP_TOOL] Result content items: %d", len(result.content) if hasattr(result, 'content') else 0)
+        
+        # Format result for LangChain (text items only; other content types are ignored)
+        content = "".join(item.text for item in result.content if item.type == "text")
+        # Keep logging separate from content: the ToolMessage carries only the canonical payload
+        content = _canonical_tool_content(content)
+        
+        # Log final content for transaction tools
+        if tool_name == "get_wallet_transaction_history" and logger.isEnabledFor(logging.INFO):
+            logger.info("[MCP_TOOL] Content preview (first 500 chars): %.500s", content)
+            logger.info("[MCP_TOOL] Final content length: %d", len(content))
+            try:
+                parsed_content = _json_loads(content)
+                logger.info("[MCP_TOOL] Parsed content keys: %s", list(parsed_content.keys()) if isinstance(parsed_content, dict) else 'Not a dict')
+                if isinstance(parsed_content, dict) and 'data' in parsed_content:
+                    data = parsed_content['data']
+                    logger.info("[MCP_TOOL] Data type: %s", type(data))
+                    if isinstance(data, dict):
+                        logger.info("[MCP_TOOL] Data keys: %s", list(data.keys()))
+                    elif isinstance(data, list):
+                        logger.info("[MCP_TOOL] Data is list with %d items", len(data))
+            except Exception as e:
+                logger.warning("[MCP_TOOL] Could not parse content as JSON: %s", e)
+        
+        return ToolMessage(
+            tool_call_id=tool_call["id"],
+            name=tool_name,
+            content=content
+        )
+    except Exception as e:
+        logger.error("Error calling MCP tool %s: %s", tool_name, e)
+        return ToolMessage(
+            tool_call_id=tool_call["id"],
+            name=tool_name,
+            content=f"Error: {str(e)}"
+        )
+
+
 async def execute_mcp_tools(state: AgentState, config: RunnableConfig):
     """Execute tools using remote MCP server."""
     logger.debug("[MCP_TOOL] execute_mcp_tools called")
@@ -292,15 +394,15 @@ async def execute_mcp_tools(state: AgentState, config: RunnableConfig):
         
     last_msg = messages[-1]
     if not isinstance(last_msg, AIMessage) or not last_msg.tool_calls:
-        logger.debug(f"[MCP_TOOL] Last message is not AIMessage with tool_calls. Type: {type(last_msg)}")
+        logger.debug("[MCP_TOOL] Last message is not AIMessage with tool_calls. Type: %s", type(last_msg))
         return state
         
-    logger.debug(f"[MCP_TOOL] Found {len(last_msg.tool_calls)} tool call(s)")
+    logger.debug("[MCP_TOOL] Found %d tool call(s)", len(last_msg.tool_calls))
     
     # Extract external token from config if available
     logger.debug("[MCP_TOOL] Starting token extraction...")
     external_token = extract_token_from_config(config)
-    logger.debug(f"[MCP_TOOL] Token from config: {'Found' if external_token else 'NOT FOUND'}")
+    logger.debug("[MCP_TOOL] Token from config: %s", 'Found' if external_token else 'NOT FOUND')
     
     # Also try to get token from context variable (set by middleware)
     # This is a workaround for CopilotKit not forwarding custom headers/metadata
@@ -309,112 +411,59 @@ async def execute_mcp_tools(state: AgentState, config: RunnableConfig):
             token_from_context = sasai_token_context.get()
             if token_from_context:
                 external_token = token_from_context
-                logger.info(f"[MCP_TOOL] ✅ Found Sasai token in context (preview): {external_token[:20]}...")
+                logger.info("[MCP_TOOL] ✅ Found Sasai token in context (preview): %.20s...", external_token)
             else:
                 logger.debug("[MCP_TOOL] Token from context: NOT FOUND")
         except LookupError as e:
-            logger.warning(f"[MCP_TOOL] ContextVar not set in this context: {e}")
+            logger.warning("[MCP_TOOL] ContextVar not set in this context: %s", e)
         except Exception as e:
-            logger.warning(f"[MCP_TOOL] Could not access token from context: {type(e).__name__}: {e}", exc_info=True)
+            logger.warning("[MCP_TOOL] Could not access token from context: %s: %s", type(e).__name__, e, exc_info=True)
     
-    use_token_manager = os.getenv("USE_TOKEN_MANAGER", "true").lower() == "true"
-    logger.debug(f"[MCP_TOOL] Token manager enabled: {use_token_manager}, External token available: {bool(external_token)}")
+    use_token_manager = USE_TOKEN_MANAGER
+    logger.debug("[MCP_TOOL] Token manager enabled: %s, External token available: %s", use_token_manager, bool(external_token))
     
     # If token manager is disabled, we must have an external token
     if not use_token_manager and not external_token:
         logger.warning("[MCP_TOOL] Token manager is disabled but no external token found in config")
     
-    mcp_url = os.getenv("MCP_SERVER_URL", "http://localhost:8001/mcp")
-    results = []
+    # Tool calls are independent RPCs over the shared MCP session, so run them
+    # concurrently; gather preserves order so tool_call_ids line up.
+    results = await asyncio.gather(
+        *(_invoke_mcp_tool(tc, external_token, use_token_manager) for tc in last_msg.tool_calls)
+    )
     
-    async with sse_client(mcp_url) as (read, write):
-        async with ClientSession(read, write) as session:
-            await session.initialize()
-            
-            for tool_call in last_msg.tool_calls:
-                tool_name = tool_call["name"]
-                tool_args = tool_call["args"].copy() if tool_call["args"] else {}
-                
-                logger.debug(f"[MCP_TOOL] Processing tool: {tool_name}")
-                
-                # ALWAYS inject external_token if provided (takes precedence over token manager)
-                # If token manager is disabled, external_token is required
-                if external_token:
-                    tool_args["external_token"] = external_token
-                    logger.info(f"[MCP_TOOL] ✅ Injected external_token for {tool_name} (preview: {external_token[:20]}...)")
-                elif not use_token_manager:
-                    logger.error(f"[MCP_TOOL] ❌ Token manager disabled but no external_token provided for {tool_name}")
-                    # Don't inject None - let the tool handle the error
-                else:
-                    logger.debug(f"[MCP_TOOL] No external token, will use token manager for {tool_name}")
-                
-                try:
-                    # Call the tool on the MCP server
-                    # 🎯 LOG 4: Tool Call
-                    logger.info(f"🟠 [4/4] TOOL CALL: {tool_name}({', '.join([f'{k}={v}' for k, v in tool_args.items() if k != 'external_token'])})")
-                    
-                    result = await session.call_tool(tool_name, arguments=tool_args)
-                    
-                    # Log the raw MCP result structure
-                    logger.info(f"[MCP_TOOL] Tool: {tool_name}")
-                    logger.info(f"[MCP_TOOL] Result type: {type(result)}")
-                    logger.info(f"[MCP_TOOL] Result content items: {len(result.content) if hasattr(result, 'content') else 0}")
-                    
-                    # Format result for LangChain
-                    content = ""
-                    for content_item in result.content:
-                        if content_item.type == "text":
-                            content += content_item.text
-                            # Log the content for transaction tools
-                            if tool_name == "get_wallet_transaction_history":
-                                logger.info(f"[MCP_TOOL] Content preview (first 500 chars): {content[:500]}")
-                        # Handle other content types if needed
-                    
-                    # Log final content for transaction tools
-                    if tool_name == "get_wallet_transaction_history":
-                        logger.info(f"[MCP_TOOL] Final content length: {len(content)}")
-                        try:
-                            import json
-                            parsed_content = json.loads(content)
-                            logger.info(f"[MCP_TOOL] Parsed content keys: {list(parsed_content.keys()) if isinstance(parsed_content, dict) else 'Not a dict'}")
-                            if isinstance(parsed_content, dict) and 'data' in parsed_content:
-                                data = parsed_content['data']
-                                logger.info(f"[MCP_TOOL] Data type: {type(data)}")
-                                if isinstance(data, dict):
-                                    logger.info(f"[MCP_TOOL] Data keys: {list(data.keys())}")
-                                elif isinstance(data, list):
-                                    logger.info(f"[MCP_TOOL] Data is list with {len(data)} items")
-                        except Exception as e:
-                            logger.warning(f"[MCP_TOOL] Could not parse content as JSON: {e}")
-                    
-                    results.append(ToolMessage(
-                        tool_call_id=tool_call["id"],
-                        name=tool_name,
-                        content=content
-                    ))
-                except Exception as e:
-                    logger.error(f"Error calling MCP tool {tool_name}: {e}")
-                    results.append(ToolMessage(
-                        tool_call_id=tool_call["id"],
-                        name=tool_name,
-                        content=f"Error: {str(e)}"
-                    ))
-    
-    return {"messages": results}
+    return {"messages": list(results)}
 
 # Replace the static ToolNode with our dynamic MCP executor
 graph_builder.add_node("remittance_tools", execute_mcp_tools)
 graph_builder.add_node("ticket_confirmation", ticket_confirmation_node)
 graph_builder.add_node("perform_ticket", perform_ticket_node)
 
-# Add workflow subgraphs as nodes
-# Compile subgraphs at graph build time (not import time)
-graph_builder.add_node("transaction_help", build_transaction_help_subgraph())
-graph_builder.add_node("financial_insights", build_financial_insights_subgraph())
-graph_builder.add_node("refund", build_refund_subgraph())
-graph_builder.add_node("loan_enquiry", build_loan_enquiry_graph())
-graph_builder.add_node("card_issue", build_card_issue_subgraph())
-graph_builder.add_node("general_enquiry", build_general_enquiry_subgraph())
+# Workflow subgraphs are compiled in build_graph(), not at import time, and run
+# through a single dispatch node instead of one graph node per workflow
+WORKFLOW_GRAPHS = {}
+
+
+def _compile_workflow_subgraphs():
+    """Compile the workflow subgraphs (once per process)."""
+    if WORKFLOW_GRAPHS:
+        return
+    WORKFLOW_GRAPHS.update(compile_workflow_subgraphs(WORKFLOWS))
+
+
+async def dispatch_workflow_node(state: AgentState, config: RunnableConfig):
+    """Run the subgraph for the workflow selected by intent detection."""
+    subgraph = WORKFLOW_GRAPHS.get(state.get("current_workflow"))
+    if subgraph is None:
+        return state
+    return await subgraph.ainvoke(state, config)
+
+
+graph_builder.add_node("dispatch_workflow", dispatch_workflow_node)
+# After the workflow subgraph, continue to chat
+# Subgraphs complete their summarization and pass control to chat_node
+# chat_node will handle the rest of the conversation
+graph_builder.add_edge("dispatch_workflow", "chat_node")
 
 # Define routing logic after chat node
 def route_after_chat(state: AgentState):
@@ -441,8 +490,14 @@ def route_after_intent(state: AgentState):
     workflow_step = state.get("workflow_step")
     
     # Only route to subgraph if workflow is detected and not yet completed
-    if current_workflow and workflow_step != "completed":
-        return current_workflow
+    if current_workflow in WORKFLOW_GRAPHS and workflow_step != "completed":
+        return "dispatch_workflow"
+    
+    # detect_intent_node already ran chat_node inline (or sent the welcome
+    # message), so route on the AI reply as if coming from chat_node
+    messages = state.get("messages", [])
+    if messages and isinstance(messages[-1], AIMessage):
+        return route_after_chat(state)
     
     # Otherwise, go to chat_node
     return "chat_node"
@@ -453,8 +508,9 @@ def route_after_confirmation(state: AgentState):
     # After interrupt, user response comes as a ToolMessage
     if messages and isinstance(messages[-1], ToolMessage):
         tool_msg = cast(ToolMessage, messages[-1])
-        # Check if this is a confirmation response
-        if tool_msg.content in ["CONFIRM", "CANCEL"] or tool_msg.content.startswith("CONFIRM"):
+        # Check if this is a confirmation response (CONFIRM... or exactly CANCEL)
+        content = tool_msg.content
+        if content.startswith(_CONFIRM_PREFIX) or content == _CANCEL:
             return "perform_ticket"
     return END
 
@@ -465,24 +521,14 @@ graph_builder.add_conditional_edges(
     "detect_intent",
     route_after_intent,
     {
-        "transaction_help": "transaction_help",
-        "financial_insights": "financial_insights",
-        "refund": "refund",
-        "loan_enquiry": "loan_enquiry",
-        "card_issue": "card_issue",
-        "general_enquiry": "general_enquiry",
-        "chat_node": "chat_node"  # No workflow detected or already processed
+        "dispatch_workflow": "dispatch_workflow",
+        # chat_node already ran inside detect_intent
+        "remittance_tools": "remittance_tools",
+        "ticket_confirmation": "ticket_confirmation",
+        END: END,
+        "chat_node": "chat_node"  # Fallback: intent detection did not answer
     }
 )
-# After workflow subgraphs, continue to chat
-# Subgraphs complete their summarization and pass control to chat_node
-# chat_node will handle the rest of the conversation
-graph_builder.add_edge("transaction_help", "chat_node")
-graph_builder.add_edge("financial_insights", "chat_node")
-graph_builder.add_edge("refund", "chat_node")
-graph_builder.add_edge("loan_enquiry", "chat_node")
-graph_builder.add_edge("card_issue", "chat_node")
-graph_builder.add_edge("general_enquiry", "chat_node")
 graph_builder.add_conditional_edges(
     "chat_node",
     route_after_chat,
@@ -500,66 +546,32 @@ graph_builder.add_conditional_edges(
 )
 graph_builder.add_edge("perform_ticket", "chat_node")
 
-# Initialize MongoDB checkpointer
-# According to MongoDB docs: https://www.mongodb.com/docs/atlas/ai-integrations/langgraph/
-# MongoDBSaver requires pymongo.MongoClient (synchronous), not AsyncIOMotorClient
-# MongoDBSaver handles async operations internally via its async methods
-_checkpointer = None
-_mongo_client = None  # Keep MongoDB client alive
+# Shared MongoClient options so every checkpointer reuses one sized connection pool
+_MONGO_CLIENT_KWARGS = {
+    "maxPoolSize": int(os.getenv("MONGODB_MAX_POOL_SIZE", "50")),
+    "serverSelectionTimeoutMS": 5000,
+}
 
 async def get_checkpointer():
-    """Get MongoDB checkpointer from environment variable.
-    
-    Returns MongoDBSaver for async execution (required by CopilotKit).
-    This must be called from an async context (e.g., FastAPI startup event).
+    """Get the process-wide checkpointer from an async context.
     
-    According to MongoDB docs: https://www.mongodb.com/docs/atlas/ai-integrations/langgraph/
-    MongoDBSaver requires pymongo.MongoClient (synchronous), but it provides
-    async methods (aput, aget, etc.) that work with LangGraph's async execution.
+    Returns the same instance the app graph was compiled with
+    (get_checkpointer_sync), so readers such as the sessions API flush and
+    read the same BatchingMongoDBSaver buffer the graph writes to. The first
+    call connects and pings MongoDB, so it runs in a worker thread.
     """
-    global _checkpointer, _mongo_client
-    
-    if _checkpointer is not None:
-        return _checkpointer
-    
-    mongodb_uri = os.getenv("MONGODB_URI")
-    mongodb_db_name = os.getenv("MONGODB_DB_NAME")
-    
-    if mongodb_uri:
-        try:
-            # According to MongoDB LangGraph docs, MongoDBSaver requires pymongo.MongoClient
-            # (synchronous client), not AsyncIOMotorClient
-            # MongoDBSaver provides async methods internally for LangGraph
-            _mongo_client = MongoClient(mongodb_uri)
-            
-            # Test connection
-            _mongo_client.admin.command('ping')
-            
-            # Create MongoDB checkpointer with synchronous pymongo client
-            # MongoDBSaver will handle async operations via its async methods
-            # Collections are created automatically on first use
-            _checkpointer = MongoDBSaver(_mongo_client, db_name=mongodb_db_name)
-            
-            logger.info(f"✅ Using MongoDBSaver for session persistence (database: {mongodb_db_name})")
-            return _checkpointer
-        except Exception as e:
-            logger.warning(f"Failed to initialize MongoDBSaver: {e}. Falling back to MemorySaver.")
-            logger.exception(e)
-            from langgraph.checkpoint.memory import MemorySaver
-            _checkpointer = MemorySaver()
-            return _checkpointer
-    else:
-        logger.warning("MONGODB_URI not set. Using MemorySaver (sessions will not persist).")
-        from langgraph.checkpoint.memory import MemorySaver
-        _checkpointer = MemorySaver()
-        return _checkpointer
+    if get_checkpointer_sync.cache_info().currsize:
+        return get_checkpointer_sync()
+    return await asyncio.to_thread(get_checkpointer_sync)
 
+@functools.cache
 def get_checkpointer_sync():
     """Get appropriate checkpointer based on environment (synchronous).
     
     This function is designed for SDK initialization at module load time.
     It respects the USE_IN_MEMORY_DB flag to support both local dev (MemorySaver)
     and production (MongoDB) without requiring runtime updates.
+    The result is cached, so the MongoDB connection and ping happen once per process.
     
     Returns:
         BaseCheckpointSaver: Either MemorySaver (in-memory) or MongoDBSaver (persistent)
@@ -569,7 +581,6 @@ def get_checkpointer_sync():
     
     if use_memory:
         logger.info("🧪 Using MemorySaver checkpointer (in-memory, non-persistent)")
-        from langgraph.checkpoint.memory import MemorySaver
         return MemorySaver()
     
     # Production mode: Use MongoDB checkpointer
@@ -579,21 +590,20 @@ def get_checkpointer_sync():
     if not mongodb_uri:
         logger.warning("⚠️  MONGODB_URI not set, falling back to MemorySaver")
         logger.warning("    Set USE_IN_MEMORY_DB=true for intentional in-memory mode")
-        from langgraph.checkpoint.memory import MemorySaver
         return MemorySaver()
     
     try:
         # Create sync MongoDB client for initialization
         # MongoDBSaver requires pymongo.MongoClient (synchronous), not motor
         # It provides async methods internally for LangGraph
-        client = MongoClient(mongodb_uri)
+        client = MongoClient(mongodb_uri, **_MONGO_CLIENT_KWARGS)
         
         # Test connection
         client.admin.command('ping')
         logger.info(f"✅ MongoDB connection successful")
         
         # Create checkpointer
-        checkpointer = MongoDBSaver(client, db_name=mongodb_db_name)
+        checkpointer = BatchingMongoDBSaver(client, db_name=mongodb_db_name)
         logger.info(f"✅ Using MongoDBSaver for persistent sessions (db: {mongodb_db_name})")
         
         return checkpointer
@@ -601,7 +611,6 @@ def get_checkpointer_sync():
     except Exception as e:
         logger.error(f"❌ Failed to initialize MongoDB checkpointer: {e}")
         logger.warning("⚠️  Falling back to MemorySaver (sessions will not persist)")
-        from langgraph.checkpoint.memory import MemorySaver
         return MemorySaver()
 
 # Compile graph with interrupt for human-in-the-loop
@@ -616,10 +625,15 @@ def build_graph(checkpointer=None):
     if checkpointer is None:
         checkpointer = get_checkpointer_sync()
     
+    _compile_workflow_subgraphs()
     compiled = graph_builder.compile(
         interrupt_after=["ticket_confirmation"],
         checkpointer=checkpointer,
     )
+    if isinstance(checkpointer, BatchingMongoDBSaver):
+        # Same graph, but each run (turn) ends with one flush of its buffered
+        # checkpoints; the subclass adds no state, so only the class changes
+        compiled.__class__ = CheckpointFlushingGraph
     checkpointer_type = type(checkpointer).__name__
     logger.info(f"📊 Graph compiled with {checkpointer_type} checkpointer")
     return compiled
@@ -4,9 +4,239 @@ These tools are called by the agent and their return values are automatically
 passed to the frontend widget render functions via CopilotKit actions.
 """
 
-from typing import List, Dict
+import asyncio
+import binascii
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from secrets import randbelow
+from typing import Dict
+from datetime import datetime, timedelta
+from functools import lru_cache
 from langchain.tools import tool
 
+# ----------------------------------------------------------------------
+# Mock data, built once at import time
+# ----------------------------------------------------------------------
+
+# Mock transactions; dates are relative to today (days_ago)
+_MOCK_TRANSACTIONS = (
+    {"id": "txn_1", "days_ago": 1, "merchant": "Coffee Shop", "description": "Coffee",
+     "amount": -50.0, "currency": "USD", "status": "completed", "reference": "532300764753"},  # UTR format
+    {"id": "txn_2", "days_ago": 2, "merchant": "Employer", "description": "Salary",
+     "amount": 2000.0, "currency": "USD", "status": "completed", "reference": "532300764754"},
+    {"id": "txn_3", "days_ago": 3, "merchant": "Grocery Store", "description": "Groceries",
+     "amount": -125.50, "currency": "USD", "status": "completed", "reference": "532300764755"},
+)
+
+# Fields returned by list_transactions (details add status and reference)
+_LIST_FIELDS = ("id", "date", "merchant", "description", "amount", "currency")
+
+
+@lru_cache(maxsize=1)
+def _dated_transactions(today) -> tuple:
+    """Mock transactions with their dates filled in; recomputed once per day."""
+    return tuple(
+        {
+            "id": txn["id"],
+            "date": (today - timedelta(days=txn["days_ago"])).strftime("%Y-%m-%d"),
+            "merchant": txn["merchant"],
+            "description": txn["description"],
+            "amount": txn["amount"],
+            "currency": txn["currency"],
+            "status": txn["status"],
+            "reference": txn["reference"],
+        }
+        for txn in _MOCK_TRANSACTIONS
+    )
+
+
+@lru_cache(maxsize=1)
+def _transactions_by_id(today) -> Dict[str, Dict]:
+    """Index of the dated mock transactions by id, for O(1) lookups."""
+    return {txn["id"]: txn for txn in _dated_transactions(today)}
+
+
+_PERIOD_LABEL = "6 MONTHS TOTAL"
+
+# Local binding for the per-call hot paths
+_now = datetime.now
+
+# Dummy data based on screenshots
+_INCOMING_TEMPLATE = {
+    "category": "incoming",
+    "total_amount": 50000.0,
+    "currency": "USD",
+    "categories": [
+        {
+            "name": "others",
+            "amount": 49665.0,
+            "percentage": 99.33,
+            "color": "#1e3a8a"  # Dark blue
+        },
+        {
+            "name": "reversal and refunds",
+            "amount": 300.0,
+            "percentage": 0.60,
+            "color": "#3b82f6"  # Medium blue
+        },
+        {
+            "name": "dividend",
+            "amount": 25.0,
+            "percentage": 0.05,
+            "color": "#60a5fa"  # Light blue
+        },
+        {
+            "name": "people",
+            "amount": 10.0,
+            "percentage": 0.02,
+            "color": "#93c5fd"  # Lightest blue
+        }
+    ]
+}
+
+_INVESTMENT_TEMPLATE = {
+    "category": "investment",
+    "total_amount": 15000.0,
+    "currency": "USD",
+    "categories": [
+        {
+            "name": "stocks",
+            "amount": 9000.0,
+            "percentage": 60.0,
+            "color": "#059669"  # Green
+        },
+        {
+            "name": "mutual funds",
+            "amount": 4500.0,
+            "percentage": 30.0,
+            "color": "#10b981"
+        },
+        {
+            "name": "bonds",
+            "amount": 1500.0,
+            "percentage": 10.0,
+            "color": "#34d399"
+        }
+    ]
+}
+
+# Overview bars: (label, insights category whose total it shows, color)
+_OVERVIEW_SERIES = (
+    ("Incoming", "incoming", "#3b82f6"),  # Blue
+    ("Investment", "investment", "#10b981"),  # Green
+    ("Spends", "spends", "#ef4444"),  # Red
+)
+
+_SPENDS_TEMPLATE = {
+    "category": "spends",
+    "total_amount": 12000.0,
+    "currency": "USD",
+    "upcoming_spends": 500.0,
+    "categories": [
+        {
+            "name": "cash transactions",
+            "amount": 3700.8,
+            "percentage": 30.84,
+            "color": "#dc2626"  # Red
+        },
+        {
+            "name": "people",
+            "amount": 3513.6,
+            "percentage": 29.28,
+            "color": "#ef4444"
+        },
+        {
+            "name": "credit card bill",
+            "amount": 3121.2,
+            "percentage": 26.01,
+            "color": "#f87171"
+        },
+        {
+            "name": "miscellaneous",
+            "amount": 1665.6,
+            "percentage": 13.88,
+            "color": "#fca5a5"
+        }
+    ]
+}
+
+
+@lru_cache(maxsize=1)
+def _default_period(today) -> tuple:
+    """Formatted (month start, today) strings; recomputed once per day."""
+    return today.replace(day=1).strftime("%Y-%m-%d"), today.strftime("%Y-%m-%d")
+
+
+def _resolve_period(start_date: str, end_date: str):
+    """Fill in missing period bounds with the current month, reading the clock at most once."""
+    if start_date and end_date:
+        return start_date, end_date
+    default_start, default_end = _default_period(_now().date())
+    return start_date or default_start, end_date or default_end
+
+
+# Insights templates by category, for the cached payload builder below
+_INSIGHT_TEMPLATES = {
+    "incoming": _INCOMING_TEMPLATE,
+    "investment": _INVESTMENT_TEMPLATE,
+    "spends": _SPENDS_TEMPLATE,
+}
+
+
+def _with_period(template: Dict, start_date: str, end_date: str) -> Dict:
+    """Shallow copy of an insights template with the period filled in (keeps key order)."""
+    return {
+        "category": template["category"],
+        "period": {
+            "start_date": start_date,
+            "end_date": end_date,
+            "label": _PERIOD_LABEL
+        },
+        **template,
+    }
+
+
+@lru_cache(maxsize=128)
+def _insights_payload(category: str, start_date: str, end_date: str) -> Dict:
+    """Insights response for a category and period, built once per distinct date range.
+
+    The payload is shared between calls; it is serialized for the widgets, never mutated.
+    """
+    return _with_period(_INSIGHT_TEMPLATES[category], start_date, end_date)
+
+
+async def _category_insights(category: str, start_date: str, end_date: str) -> Dict:
+    """Insights for one category; the I/O boundary once a real backend is wired in."""
+    return _insights_payload(category, start_date, end_date)
+
+
+async def _overview_insights(start_date: str, end_date: str) -> Dict:
+    """Cash flow overview assembled from the per-category totals."""
+    # The category fetches are independent, so run them concurrently
+    results = await asyncio.gather(
+        *(_category_insights(category, start_date, end_date) for _, category, _ in _OVERVIEW_SERIES)
+    )
+    overview = {
+        "category": "overview",
+        "currency": "USD",
+        "categories": [
+            {"name": name, "amount": insights["total_amount"], "color": color}
+            for (name, _, color), insights in zip(_OVERVIEW_SERIES, results)
+        ],
+    }
+    return _with_period(overview, start_date, end_date)
+
+
+async def _build_insight(kind: str, start_date: str = "", end_date: str = "") -> Dict:
+    """Shared body of the insights tools: default the period to the current month, then fetch.
+
+    kind is "overview" or one of the _INSIGHT_TEMPLATES categories.
+    """
+    start_date, end_date = _resolve_period(start_date, end_date)
+    if kind == "overview":
+        return await _overview_insights(start_date, end_date)
+    return await _category_insights(kind, start_date, end_date)
+
+
 @tool
 def get_balance(user_id: str) -> float:
     """Get the current wallet balance for the given user.
@@ -17,42 +247,38 @@ def get_balance(user_id: str) -> float:
     # In production, this would query a database or API
     return 1234.56
 
+def _encode_cursor(offset: int) -> str:
+    """Opaque page cursor for list_transactions (base64 of the next offset)."""
+    return urlsafe_b64encode(str(offset).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> int:
+    """Offset encoded in a list_transactions cursor; an empty or invalid cursor starts at 0."""
+    if not cursor:
+        return 0
+    try:
+        return max(int(urlsafe_b64decode(cursor.encode())), 0)
+    except (ValueError, binascii.Error):
+        return 0
+
+
 @tool
-def list_transactions(user_id: str, limit: int = 10) -> List[Dict]:
-    """List the most recent transactions for the user.
+def list_transactions(user_id: str, limit: int = 10, cursor: str = "") -> Dict:
+    """List the most recent transactions for the user, one page at a time.
     
-    Returns a list of transaction dictionaries that will be displayed in a transaction table widget.
+    Returns {"items": [...], "next_cursor": ...}; items are displayed in a transaction table widget.
     Each transaction should have: id, date, merchant/description, amount, currency.
+    Pass next_cursor back as cursor to fetch the following page; it is None on the last page.
     """
     # Placeholder data – replace with real database/API calls
-    from datetime import datetime, timedelta
-    
-    return [
-        {
-            "id": "txn_1",
-            "date": (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d"),
-            "merchant": "Coffee Shop",
-            "description": "Coffee",
-            "amount": -50.0,
-            "currency": "USD"
-        },
-        {
-            "id": "txn_2",
-            "date": (datetime.now() - timedelta(days=2)).strftime("%Y-%m-%d"),
-            "merchant": "Employer",
-            "description": "Salary",
-            "amount": 2000.0,
-            "currency": "USD"
-        },
-        {
-            "id": "txn_3",
-            "date": (datetime.now() - timedelta(days=3)).strftime("%Y-%m-%d"),
-            "merchant": "Grocery Store",
-            "description": "Groceries",
-            "amount": -125.50,
-            "currency": "USD"
-        },
-    ][:limit]
+    # (with a real backend this is a bounded index scan from the cursor, not a full fetch)
+    transactions = _dated_transactions(_now().date())
+    offset = _decode_cursor(cursor)
+    end = offset + max(limit, 0)
+    return {
+        "items": [{field: txn[field] for field in _LIST_FIELDS} for txn in transactions[offset:end]],
+        "next_cursor": _encode_cursor(end) if end < len(transactions) else None,
+    }
 
 @tool
 def get_transaction_details(user_id: str, transaction_id: str = "") -> Dict:
@@ -64,51 +290,19 @@ def get_transaction_details(user_id: str, transaction_id: str = "") -> Dict:
     Returns transaction details including merchant, date, amount, status, and UTR/reference number.
     """
     # Placeholder implementation – in production, this would query a database or API
-    from datetime import datetime, timedelta
-    import random
-    
     # Mock transaction details - in production, fetch by transaction_id or user's description
-    transactions = [
-        {
-            "id": "txn_1",
-            "date": (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d"),
-            "merchant": "Coffee Shop",
-            "description": "Coffee",
-            "amount": -50.0,
-            "currency": "USD",
-            "status": "completed",
-            "reference": "532300764753"  # UTR format
-        },
-        {
-            "id": "txn_2",
-            "date": (datetime.now() - timedelta(days=2)).strftime("%Y-%m-%d"),
-            "merchant": "Employer",
-            "description": "Salary",
-            "amount": 2000.0,
-            "currency": "USD",
-            "status": "completed",
-            "reference": "532300764754"
-        },
-        {
-            "id": "txn_3",
-            "date": (datetime.now() - timedelta(days=3)).strftime("%Y-%m-%d"),
-            "merchant": "Grocery Store",
-            "description": "Groceries",
-            "amount": -125.50,
-            "currency": "USD",
-            "status": "completed",
-            "reference": "532300764755"
-        },
-    ]
+    # (with a real backend this is a single keyed query, not fetch-all-then-filter)
+    today = _now().date()
+    transactions = _dated_transactions(today)
     
     # Find transaction by ID if provided
     if transaction_id:
-        transaction = next((t for t in transactions if t["id"] == transaction_id), None)
+        transaction = _transactions_by_id(today).get(transaction_id)
         if transaction:
-            return transaction
+            return dict(transaction)
     
     # Return most recent transaction (first in list) as fallback
-    return transactions[0] if transactions else {}
+    return dict(transactions[0]) if transactions else {}
 
 @tool
 def create_ticket(user_id: str, subject: str, body: str) -> str:
@@ -119,202 +313,40 @@ def create_ticket(user_id: str, subject: str, body: str) -> str:
     """
     # Placeholder – in a real system you'd call a ticketing service
     # The actual creation happens after user confirmation via the widget
-    import random
-    ticket_id = f"TICKET-{random.randint(10000, 99999)}"
+    ticket_id = f"TICKET-{randbelow(90000) + 10000}"
     # Return message with ticket ID in a consistent format for easy parsing
     return f"Support ticket {ticket_id} created successfully. Our team will get back to you soon."
 
 @tool
-def get_incoming_insights(user_id: str, account: str = "all accounts", start_date: str = "", end_date: str = "") -> Dict:
+async def get_incoming_insights(user_id: str, account: str = "all accounts", start_date: str = "", end_date: str = "") -> Dict:
     """Get financial insights for incoming transactions.
     
     Returns insights including total amount, categories with percentages, and subcategories.
     Categories include: others, reversal_and_refunds, dividend, people, etc.
     """
-    from datetime import datetime, timedelta
-    
-    # Default to current month if dates not provided
-    if not start_date:
-        start_date = datetime.now().replace(day=1).strftime("%Y-%m-%d")
-    if not end_date:
-        end_date = datetime.now().strftime("%Y-%m-%d")
-    
-    # Dummy data based on screenshots
-    return {
-        "category": "incoming",
-        "period": {
-            "start_date": start_date,
-            "end_date": end_date,
-            "label": "6 MONTHS TOTAL"
-        },
-        "total_amount": 50000.0,
-        "currency": "USD",
-        "categories": [
-            {
-                "name": "others",
-                "amount": 49665.0,
-                "percentage": 99.33,
-                "color": "#1e3a8a"  # Dark blue
-            },
-            {
-                "name": "reversal and refunds",
-                "amount": 300.0,
-                "percentage": 0.60,
-                "color": "#3b82f6"  # Medium blue
-            },
-            {
-                "name": "dividend",
-                "amount": 25.0,
-                "percentage": 0.05,
-                "color": "#60a5fa"  # Light blue
-            },
-            {
-                "name": "people",
-                "amount": 10.0,
-                "percentage": 0.02,
-                "color": "#93c5fd"  # Lightest blue
-            }
-        ]
-    }
+    return await _build_insight("incoming", start_date, end_date)
 
 @tool
-def get_investment_insights(user_id: str, account: str = "all accounts", start_date: str = "", end_date: str = "") -> Dict:
+async def get_investment_insights(user_id: str, account: str = "all accounts", start_date: str = "", end_date: str = "") -> Dict:
     """Get financial insights for investment transactions.
     
     Returns insights including total amount, categories with percentages, and subcategories.
     """
-    from datetime import datetime, timedelta
-    
-    # Default to current month if dates not provided
-    if not start_date:
-        start_date = datetime.now().replace(day=1).strftime("%Y-%m-%d")
-    if not end_date:
-        end_date = datetime.now().strftime("%Y-%m-%d")
-    
-    # Dummy data
-    return {
-        "category": "investment",
-        "period": {
-            "start_date": start_date,
-            "end_date": end_date,
-            "label": "6 MONTHS TOTAL"
-        },
-        "total_amount": 15000.0,
-        "currency": "USD",
-        "categories": [
-            {
-                "name": "stocks",
-                "amount": 9000.0,
-                "percentage": 60.0,
-                "color": "#059669"  # Green
-            },
-            {
-                "name": "mutual funds",
-                "amount": 4500.0,
-                "percentage": 30.0,
-                "color": "#10b981"
-            },
-            {
-                "name": "bonds",
-                "amount": 1500.0,
-                "percentage": 10.0,
-                "color": "#34d399"
-            }
-        ]
-    }
+    return await _build_insight("investment", start_date, end_date)
 
 @tool
-def get_cash_flow_overview(user_id: str, account: str = "all accounts", start_date: str = "", end_date: str = "") -> Dict:
+async def get_cash_flow_overview(user_id: str, account: str = "all accounts", start_date: str = "", end_date: str = "") -> Dict:
     """Get overall cash flow overview with incoming, investment, and spends totals.
     
     Returns a summary with totals for each main category for displaying in a bar chart.
     """
-    from datetime import datetime, timedelta
-    
-    # Default to current month if dates not provided
-    if not start_date:
-        start_date = datetime.now().replace(day=1).strftime("%Y-%m-%d")
-    if not end_date:
-        end_date = datetime.now().strftime("%Y-%m-%d")
-    
-    # Dummy data - totals from individual insights
-    return {
-        "category": "overview",
-        "period": {
-            "start_date": start_date,
-            "end_date": end_date,
-            "label": "6 MONTHS TOTAL"
-        },
-        "currency": "USD",
-        "categories": [
-            {
-                "name": "Incoming",
-                "amount": 50000.0,
-                "color": "#3b82f6"  # Blue
-            },
-            {
-                "name": "Investment",
-                "amount": 15000.0,
-                "color": "#10b981"  # Green
-            },
-            {
-                "name": "Spends",
-                "amount": 12000.0,
-                "color": "#ef4444"  # Red
-            }
-        ]
-    }
+    return await _build_insight("overview", start_date, end_date)
 
 @tool
-def get_spends_insights(user_id: str, account: str = "all accounts", start_date: str = "", end_date: str = "") -> Dict:
+async def get_spends_insights(user_id: str, account: str = "all accounts", start_date: str = "", end_date: str = "") -> Dict:
     """Get financial insights for spending transactions.
     
     Returns insights including total amount, categories with percentages, and upcoming spends.
     Categories include: cash transactions, people, credit card bill, miscellaneous, etc.
     """
-    from datetime import datetime, timedelta
-    
-    # Default to current month if dates not provided
-    if not start_date:
-        start_date = datetime.now().replace(day=1).strftime("%Y-%m-%d")
-    if not end_date:
-        end_date = datetime.now().strftime("%Y-%m-%d")
-    
-    # Dummy data based on screenshots
-    return {
-        "category": "spends",
-        "period": {
-            "start_date": start_date,
-            "end_date": end_date,
-            "label": "6 MONTHS TOTAL"
-        },
-        "total_amount": 12000.0,
-        "currency": "USD",
-        "upcoming_spends": 500.0,
-        "categories": [
-            {
-                "name": "cash transactions",
-                "amount": 3700.8,
-                "percentage": 30.84,
-                "color": "#dc2626"  # Red
-            },
-            {
-                "name": "people",
-                "amount": 3513.6,
-                "percentage": 29.28,
-                "color": "#ef4444"
-            },
-            {
-                "name": "credit card bill",
-                "amount": 3121.2,
-                "percentage": 26.01,
-                "color": "#f87171"
-            },
-            {
-                "name": "miscellaneous",
-                "amount": 1665.6,
-                "percentage": 13.88,
-                "color": "#fca5a5"
-            }
-        ]
-    }
+    return await _build_insight("spends", start_date, end_date)
@@ -5,8 +5,11 @@ Each workflow handles a specific domain (transactions, refunds, loans, cards, et
 and follows a consistent pattern: summarize → identify → resolve → escalate.
 """
 
-from typing import Dict, Type, Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Mapping, Type, Optional
 from .base import BaseWorkflow
+from .keywords import KeywordMatcher
 
 # Import all workflows
 from .transaction_help import TransactionHelpWorkflow
@@ -18,11 +21,16 @@ from .financial_insights import FinancialInsightsWorkflow
 
 # Workflow registry
 _workflows: Dict[str, Type[BaseWorkflow]] = {}
+# Live read-only view of the registry, shared by every get_all_workflows() caller
+_workflows_view: Mapping[str, Type[BaseWorkflow]] = MappingProxyType(_workflows)
+# One shared instance per registered workflow, created on first use
+_instances: Dict[str, BaseWorkflow] = {}
 
 
 def register_workflow(workflow_class: Type[BaseWorkflow]):
     """Register a workflow class."""
     _workflows[workflow_class.name] = workflow_class
+    _instances.pop(workflow_class.name, None)
     return workflow_class
 
 
@@ -31,46 +39,57 @@ def get_workflow(name: str) -> Optional[Type[BaseWorkflow]]:
     return _workflows.get(name)
 
 
-def get_all_workflows() -> Dict[str, Type[BaseWorkflow]]:
-    """Get all registered workflows."""
-    return _workflows.copy()
+def get_workflow_instance(name: str) -> Optional[BaseWorkflow]:
+    """Get the shared instance of a workflow (workflows hold no per-request state)."""
+    instance = _instances.get(name)
+    if instance is None:
+        workflow_class = _workflows.get(name)
+        if workflow_class is None:
+            return None
+        instance = _instances[name] = workflow_class()
+    return instance
 
 
+def get_all_workflows() -> Mapping[str, Type[BaseWorkflow]]:
+    """Get a read-only view of all registered workflows (use dict(...) for a mutable copy)."""
+    return _workflows_view
+
+
+# Every workflow, in detection priority order (most specific first);
+# registration follows this order, so _workflows iterates by priority
+_ORDERED = (
+    TransactionHelpWorkflow,
+    FinancialInsightsWorkflow,
+    RefundWorkflow,
+    LoanEnquiryWorkflow,
+    CardIssueWorkflow,
+    GeneralEnquiryWorkflow,  # Fallback
+)
+
+# Keyword matcher over all workflows, built by _register_all_workflows()
+_intent_matcher: Optional[KeywordMatcher[str]] = None
+
+
+@lru_cache(maxsize=512)
 def detect_workflow(user_message: str) -> Optional[str]:
-    """Detect which workflow to use based on user message."""
-    user_lower = user_message.lower()
-    
-    # Check workflows in priority order (most specific first)
-    priority_order = [
-        TransactionHelpWorkflow,
-        FinancialInsightsWorkflow,
-        RefundWorkflow,
-        LoanEnquiryWorkflow,
-        CardIssueWorkflow,
-        GeneralEnquiryWorkflow,  # Fallback
-    ]
-    
-    for workflow_class in priority_order:
-        if workflow_class.matches_intent(user_lower):
-            return workflow_class.name
-    
-    return None
+    """Detect which workflow to use based on user message (memoized; pure given the registry)."""
+    # Single scan over every workflow's keywords; the first workflow in
+    # priority order with a matching keyword wins
+    return _intent_matcher.match(user_message.lower())
 
 
 # Auto-register all workflows
 def _register_all_workflows():
     """Register all workflow classes."""
-    workflows = [
-        TransactionHelpWorkflow,
-        RefundWorkflow,
-        LoanEnquiryWorkflow,
-        CardIssueWorkflow,
-        GeneralEnquiryWorkflow,
-        FinancialInsightsWorkflow,
-    ]
-    
-    for workflow_class in workflows:
+    for workflow_class in _ORDERED:
         register_workflow(workflow_class)
+    
+    global _intent_matcher
+    _intent_matcher = KeywordMatcher(
+        [(workflow_class.name, workflow_class.intent_keywords) for workflow_class in _workflows.values()]
+    )
+    # Cached detections were made against the previous keyword set
+    detect_workflow.cache_clear()
 
 
 # Initialize on import
@@ -0,0 +1,58 @@
+"""Per-user TTL cache for workflow summarize() reads."""
+
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Minimal time-bounded cache.
+
+    Entries expire `ttl` seconds after they are set, measured on the monotonic
+    clock. Expired entries are dropped when read, or when a set() finds the
+    cache at `maxsize`; if none have expired, the oldest entry is evicted.
+    Pass maxsize whenever keys come from request input.
+    """
+
+    __slots__ = ("_data", "_ttl", "_maxsize")
+
+    def __init__(self, ttl: float = 60, maxsize: Optional[int] = None):
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._ttl = ttl
+        self._maxsize = maxsize
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self._data.pop(key, None)
+            return None
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any):
+        """Cache value under key for the next `ttl` seconds."""
+        now = time.monotonic()
+        # Re-insert so dict order stays oldest-set first
+        self._data.pop(key, None)
+        if self._maxsize is not None and len(self._data) >= self._maxsize:
+            self._evict(now)
+        self._data[key] = (now + self._ttl, value)
+
+    def _evict(self, now: float):
+        """Drop expired entries; if that frees nothing, drop the oldest one."""
+        expired = [key for key, (expires, _) in self._data.items() if expires <= now]
+        for key in expired:
+            del self._data[key]
+        if len(self._data) >= self._maxsize:
+            del self._data[next(iter(self._data))]
+
+    def clear(self):
+        self._data.clear()
+
+
+# summarize() results keyed by (workflow name, user id), bounded since every
+# user adds keys. Cached values are shared between requests and must be
+# treated as read-only.
+summary_cache = TTLCache(ttl=60, maxsize=1024)
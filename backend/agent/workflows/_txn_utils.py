@@ -0,0 +1,88 @@
+"""Transaction lookup and summary helpers shared by the transaction help workflow and subgraph."""
+
+import logging
+import re
+from datetime import date, timedelta
+from functools import lru_cache
+from itertools import islice
+from types import MappingProxyType
+from typing import Any, Mapping, Sequence
+
+from langchain_core.messages import BaseMessage
+from agent.tools import get_transaction_details
+from ._cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Transaction ids as users type them, in any case ("TXN_12" is txn_12)
+_TXN_RE = re.compile(r"txn_\d+", re.IGNORECASE)
+
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+# Transaction details by (user_id, transaction_id), reused for a few minutes;
+# ids come from user messages, so the cache is size-bounded
+_transaction_cache = TTLCache(ttl=300, maxsize=1024)
+
+
+def extract_txn_id(messages: Sequence[BaseMessage]) -> str:
+    """The first transaction id in the last five messages, newest first, or ""."""
+    for msg in islice(reversed(messages), 5):
+        content = msg.content
+        match = _TXN_RE.search(content if isinstance(content, str) else str(content))
+        if match:
+            return match.group(0).lower()
+    return ""
+
+
+@lru_cache(maxsize=1)
+def _fallback_txn(today: date) -> Mapping[str, Any]:
+    """Mock transaction from the day before `today`; built once per day, shared read-only."""
+    return MappingProxyType({
+        "id": "txn_1",
+        "date": (today - timedelta(days=1)).isoformat(),
+        "merchant": "Coffee Shop",
+        "description": "Coffee",
+        "amount": -50.0,
+        "currency": "USD",
+        "status": "completed",
+        "reference": "532300764753"
+    })
+
+
+def fetch_or_fallback(user_id: str, transaction_id: str) -> Mapping[str, Any]:
+    """
+    Fetch transaction details, or the mock transaction if the lookup fails.
+    Follow-up turns about the same transaction are served from the cache.
+    """
+    key = (user_id, transaction_id)
+    # In production, the tool would be called through the graph (ToolNode)
+    try:
+        transaction = _transaction_cache.get(key)
+        if transaction is None:
+            logger.debug("Fetching transaction details for ID: %s", transaction_id)
+            transaction = get_transaction_details.invoke({
+                "user_id": user_id,
+                "transaction_id": transaction_id
+            })
+            _transaction_cache.set(key, transaction)
+    except Exception as e:
+        logger.warning("Failed to fetch transaction details: %s, using fallback", e)
+        transaction = _fallback_txn(date.today())
+    return transaction
+
+
+def format_summary(transaction: Mapping[str, Any]) -> str:
+    """One-line payment summary, e.g. "Good news: your payment of 50.00 USD to ... was successful."."""
+    amount = abs(transaction.get("amount", 0))
+    currency = transaction.get("currency", "USD")
+    merchant = transaction.get("merchant", "merchant")
+    date_str = transaction.get("date", "")
+
+    # "2025-11-22" -> "22 Nov 2025" without strptime/strftime's locale-aware parsing
+    try:
+        day = date.fromisoformat(date_str)
+        formatted_date = f"{day.day:02d} {_MONTHS[day.month - 1]} {day.year}"
+    except (TypeError, ValueError):
+        formatted_date = date_str
+
+    return f"Good news: your payment of {amount:.2f} {currency} to {merchant} on {formatted_date} was successful."
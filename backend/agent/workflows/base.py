@@ -3,81 +3,164 @@
 All workflows should inherit from this class and implement the required methods.
 """
 
-from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any
+import re
+from dataclasses import asdict, dataclass, field, is_dataclass
+from types import MappingProxyType
+from typing import ClassVar, FrozenSet, List, Dict, Mapping, Optional, Any, Sequence, Tuple
 from langchain_core.runnables import RunnableConfig
 from engine.state import AgentState
 
+try:
+    import orjson
 
-class BaseWorkflow(ABC):
-    """Base class for all support workflows."""
+    def _context_json(context: Any) -> str:
+        """Serialize a workflow context (dict or dataclass) for a ticket body."""
+        return orjson.dumps(context, default=str).decode()
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    import json
+
+    def _json_default(obj: Any) -> Any:
+        return asdict(obj) if is_dataclass(obj) and not isinstance(obj, type) else str(obj)
+
+    def _context_json(context: Any) -> str:
+        """Serialize a workflow context (dict or dataclass) for a ticket body."""
+        return json.dumps(context, default=_json_default, ensure_ascii=False)
+
+
+def _compile_keywords(keywords: List[str]) -> Optional[re.Pattern]:
+    """Compile keywords into one literal alternation (None if there are none)."""
+    return re.compile("|".join(map(re.escape, keywords))) if keywords else None
+
+
+@dataclass(slots=True, frozen=True)
+class ResolutionGuide:
+    """Resolution guidance for one issue (see BaseWorkflow.get_resolution_guide)."""
+    message: str
+    steps: Tuple[str, ...]
+    reference: str = ""
+    can_resolve: bool = True
+    # Read-only dict view, built once per guide
+    _view: Mapping[str, Any] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, "_view", MappingProxyType({
+            "message": self.message,
+            "steps": self.steps,
+            "reference": self.reference,
+            "can_resolve": self.can_resolve
+        }))
+    
+    def as_dict(self) -> Mapping[str, Any]:
+        """The guide in the dict shape get_resolution_guide returns."""
+        return self._view
+
+
+class BaseWorkflow:
+    """Base class for all support workflows.
+    
+    Workflows are stateless, so the registry shares one instance per class.
+    """
     
     # Override in subclasses
     name: str = ""  # Unique workflow identifier
     intent_keywords: List[str] = []  # Keywords that trigger this workflow
+    # Keywords that route a chat message into this workflow's subgraph. Kept
+    # narrower than intent_keywords: broad phrases ("what is", "explain",
+    # "cancel payment") go to the chat model instead of a canned summary.
+    routing_keywords: ClassVar[Tuple[str, ...]] = ()
     description: str = ""  # Human-readable description
     
+    # Keywords that ask for escalation to a support ticket
+    escalate_keywords: ClassVar[List[str]] = [
+        "create ticket", "raise ticket", "escalate", "not resolved",
+        "contacted merchant, issue not resolved", "still having problem"
+    ]
+    
+    # Compiled alternations of intent_keywords / escalate_keywords, built per subclass
+    _intent_re: ClassVar[Optional[re.Pattern]] = None
+    _escalate_re: ClassVar[Optional[re.Pattern]] = None
+    # Single-word intent keywords, matched against message tokens by hash lookup
+    _intent_tokens: ClassVar[FrozenSet[str]] = frozenset()
+    
+    # Ticket body layout, filled in one pass by get_ticket_body
+    _TICKET_BODY_TPL: ClassVar[str] = (
+        "Issue Type: {issue}\n"
+        "Workflow: {wf}\n\n"
+        "Context: {ctx}\n\n"
+        "Conversation Summary:\n{tail}"
+    )
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._intent_re = _compile_keywords(cls.intent_keywords)
+        cls._intent_tokens = frozenset(kw for kw in cls.intent_keywords if kw.split() == [kw])
+        cls._escalate_re = _compile_keywords(cls.escalate_keywords)
+    
     @classmethod
-    def matches_intent(cls, user_message: str) -> bool:
-        """Check if user message matches this workflow's intent."""
-        user_lower = user_message.lower()
-        return any(keyword in user_lower for keyword in cls.intent_keywords)
+    def matches_intent(cls, user_lower: str) -> bool:
+        """Check if user message matches this workflow's intent.
+        
+        Expects the already lower-cased message (callers lower it once per turn).
+        """
+        if cls._intent_re is None:
+            return False
+        # A whole-word hit on a single-word keyword is also a substring hit, so
+        # the token probe can only short-circuit; phrases and partial words
+        # still go through the regex
+        if not cls._intent_tokens.isdisjoint(user_lower.split()):
+            return True
+        return cls._intent_re.search(user_lower) is not None
     
-    @abstractmethod
     async def summarize(self, state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
         """
         Step 1: Get relevant context and summarize.
         Returns a dict with context information (transaction details, loan status, etc.)
         """
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
     def get_summary_message(self, context: Dict[str, Any]) -> str:
         """
         Step 2: Generate the summary message shown to user.
         Example: "Good news: your payment of $50.00 to Coffee Shop was successful."
         """
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
     def get_question(self, context: Dict[str, Any]) -> str:
         """
         Step 3: Get the question to ask after summary.
         Example: "Tell us what's wrong" or "What would you like to know?"
         """
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
-    def get_suggestions(self, context: Dict[str, Any]) -> List[str]:
+    def get_suggestions(self, context: Dict[str, Any]) -> Sequence[str]:
         """
         Step 4: Get common issue suggestions.
-        Returns list of suggestion strings.
+        Returns a read-only sequence of suggestion strings.
         """
-        pass
+        raise NotImplementedError
     
-    @abstractmethod
-    def get_resolution_guide(self, issue_type: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    def get_resolution_guide(self, issue_type: str, context: Dict[str, Any]) -> Mapping[str, Any]:
         """
         Step 5: Get resolution guidance for a specific issue.
-        Returns dict with:
+        Returns a read-only dict (typically ResolutionGuide.as_dict()) with:
         - message: Guidance text
         - steps: List of actionable steps
         - reference: Reference number/ID if applicable
         - can_resolve: Whether this can be resolved without ticket
         """
-        pass
+        raise NotImplementedError
     
-    def should_escalate(self, user_message: str, context: Dict[str, Any]) -> bool:
+    def should_escalate(self, user_message: str, context: Dict[str, Any], user_lower: Optional[str] = None) -> bool:
         """
         Step 6: Determine if issue should be escalated to ticket.
         Override if custom escalation logic needed.
+        Pass user_lower if the caller already has the lower-cased message.
         """
-        escalate_keywords = [
-            "create ticket", "raise ticket", "escalate", "not resolved",
-            "contacted merchant, issue not resolved", "still having problem"
-        ]
-        user_lower = user_message.lower()
-        return any(keyword in user_lower for keyword in escalate_keywords)
+        if self._escalate_re is None:
+            return False
+        if user_lower is None:
+            user_lower = user_message.lower()
+        return self._escalate_re.search(user_lower) is not None
     
     def get_ticket_subject(self, issue_type: str, context: Dict[str, Any]) -> str:
         """Generate ticket subject from issue and context."""
@@ -85,9 +168,10 @@ class BaseWorkflow(ABC):
     
     def get_ticket_body(self, issue_type: str, context: Dict[str, Any], conversation_history: List[str]) -> str:
         """Generate ticket body from issue, context, and conversation."""
-        body = f"Issue Type: {issue_type}\n"
-        body += f"Workflow: {self.name}\n\n"
-        body += f"Context: {context}\n\n"
-        body += f"Conversation Summary:\n" + "\n".join(conversation_history[-3:])
-        return body
+        return self._TICKET_BODY_TPL.format(
+            issue=issue_type,
+            wf=self.name,
+            ctx=_context_json(context),
+            tail="\n".join(conversation_history[-3:]),
+        )
 
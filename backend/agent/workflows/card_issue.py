@@ -1,9 +1,41 @@
 """Card issue workflow - handles card-related problems and enquiries."""
 
-from typing import List, Dict, Any
+from dataclasses import dataclass, replace
+from typing import ClassVar, Dict, Any, Mapping, Tuple, Sequence
 from langchain_core.runnables import RunnableConfig
 from engine.state import AgentState
-from .base import BaseWorkflow
+from ._cache import summary_cache
+from .base import BaseWorkflow, ResolutionGuide
+from .keywords import GuideMatcher
+
+
+@dataclass(slots=True, frozen=True)
+class Card:
+    """A user's payment card."""
+    id: str
+    type: str
+    last_four: str
+    status: str
+    expiry: str
+
+
+@dataclass(slots=True, frozen=True)
+class CardContext:
+    """Context returned by CardIssueWorkflow.summarize."""
+    cards: Tuple[Card, ...]
+    user_id: str
+
+
+# Mock card until card details come from a tool
+_DEMO_CARD = Card(id="card_1", type="debit", last_four="1234", status="active", expiry="12/26")
+
+# Shared read-only fallback guide for unmatched issues
+_DEFAULT_CARD_GUIDE = ResolutionGuide(
+    message="I can help you with card issues. Please describe the specific problem you're experiencing.",
+    steps=("Describe the issue", "I'll provide specific guidance"),
+    reference="",
+    can_resolve=True
+)
 
 
 class CardIssueWorkflow(BaseWorkflow):
@@ -14,130 +46,124 @@ class CardIssueWorkflow(BaseWorkflow):
         "card", "debit card", "credit card", "card blocked", "card not working",
         "card lost", "card stolen", "card declined", "card issue", "card problem"
     ]
+    # Phrases that route a chat message into the subgraph (subset of intent_keywords)
+    routing_keywords: ClassVar[Tuple[str, ...]] = (
+        "card", "debit card", "credit card", "card blocked", "card not working"
+    )
     description = "Handle card-related issues and enquiries"
     
-    async def summarize(self, state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
+    async def summarize(self, state: AgentState, config: RunnableConfig) -> CardContext:
         """Get user's card information."""
-        # In production, this would call a tool to get card details
-        return {
-            "cards": [
-                {
-                    "id": "card_1",
-                    "type": "debit",
-                    "last_four": "1234",
-                    "status": "active",
-                    "expiry": "12/26"
-                }
-            ],
-            "user_id": state.get("user_id", "demo_user")
-        }
+        user_id = state.get("user_id", "demo_user")
+        key = (self.name, user_id)
+        context = summary_cache.get(key)
+        if context is None:
+            # In production, this would call a tool to get card details
+            context = CardContext(cards=(_DEMO_CARD,), user_id=user_id)
+            summary_cache.set(key, context)
+        return context
     
-    def get_summary_message(self, context: Dict[str, Any]) -> str:
+    def get_summary_message(self, context: CardContext) -> str:
         """Generate card summary message."""
-        cards = context.get("cards", [])
-        if cards:
-            card = cards[0]
-            return f"I can see you have a {card.get('type', 'card')} card ending in {card.get('last_four', '****')}. How can I help you with your card?"
+        if context.cards:
+            card = context.cards[0]
+            return f"I can see you have a {card.type} card ending in {card.last_four}. How can I help you with your card?"
         return "I can help you with card-related issues. What problem are you facing?"
     
-    def get_question(self, context: Dict[str, Any]) -> str:
+    def get_question(self, context: CardContext) -> str:
         """Get the question to ask after summary."""
         return "What issue are you experiencing with your card?"
     
-    def get_suggestions(self, context: Dict[str, Any]) -> List[str]:
+    _SUGGESTIONS: ClassVar[Tuple[str, ...]] = (
+        "Card not working",
+        "Card blocked",
+        "Card declined",
+        "Lost or stolen card",
+        "Card activation",
+        "Card limit increase"
+    )
+    
+    def get_suggestions(self, context: CardContext) -> Sequence[str]:
         """Get common card issue suggestions."""
-        return [
-            "Card not working",
-            "Card blocked",
-            "Card declined",
-            "Lost or stolen card",
-            "Card activation",
-            "Card limit increase"
-        ]
+        return self._SUGGESTIONS
+    
+    # Guides are keyed by issue; the card reference is filled in per call
+    _GUIDES: ClassVar[Dict[str, ResolutionGuide]] = {
+        "card not working": ResolutionGuide(
+            message="Let's troubleshoot your card. First, check if your card is activated and has sufficient balance.",
+            steps=(
+                "Verify card is activated",
+                "Check account balance",
+                "Try a different merchant or ATM",
+                "If still not working, we may need to block and reissue"
+            ),
+            reference="",
+            can_resolve=True
+        ),
+        "card blocked": ResolutionGuide(
+            message="Your card may be blocked due to security reasons or suspicious activity. I can help you unblock it.",
+            steps=(
+                "Verify your identity",
+                "Confirm recent transactions",
+                "Unblock card if verified",
+                "If fraud suspected, card will remain blocked"
+            ),
+            reference="",
+            can_resolve=False  # Requires security verification
+        ),
+        "card declined": ResolutionGuide(
+            message="Card declines can happen due to insufficient funds, merchant restrictions, or security checks.",
+            steps=(
+                "Check account balance",
+                "Verify transaction amount",
+                "Try a different merchant",
+                "Contact support if issue persists"
+            ),
+            reference="",
+            can_resolve=True
+        ),
+        "lost or stolen card": ResolutionGuide(
+            message="If your card is lost or stolen, we need to block it immediately to prevent unauthorized use.",
+            steps=(
+                "Confirm card is lost/stolen",
+                "Block card immediately",
+                "Report to authorities if stolen",
+                "Request new card replacement"
+            ),
+            reference="",
+            can_resolve=False  # Requires immediate action
+        ),
+        "card activation": ResolutionGuide(
+            message="I can help you activate your card. You'll need your card details and may need to set a PIN.",
+            steps=(
+                "Provide card number and CVV",
+                "Verify identity",
+                "Set PIN if required",
+                "Activate card"
+            ),
+            reference="",
+            can_resolve=True
+        ),
+        "card limit increase": ResolutionGuide(
+            message="I can help you request a card limit increase. This requires a credit check and approval.",
+            steps=(
+                "Check current limit",
+                "Review eligibility for increase",
+                "Submit increase request",
+                "Wait for approval (usually 24-48 hours)"
+            ),
+            reference="",
+            can_resolve=False  # Requires approval process
+        ),
+    }
+    
+    _GUIDE_MATCHER: ClassVar[GuideMatcher] = GuideMatcher(list(_GUIDES))
     
-    def get_resolution_guide(self, issue_type: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    def get_resolution_guide(self, issue_type: str, context: CardContext) -> Mapping[str, Any]:
         """Get resolution guidance for card issues."""
-        cards = context.get("cards", [])
-        card = cards[0] if cards else {}
-        
-        guides = {
-            "card not working": {
-                "message": "Let's troubleshoot your card. First, check if your card is activated and has sufficient balance.",
-                "steps": [
-                    "Verify card is activated",
-                    "Check account balance",
-                    "Try a different merchant or ATM",
-                    "If still not working, we may need to block and reissue"
-                ],
-                "reference": card.get("id", ""),
-                "can_resolve": True
-            },
-            "card blocked": {
-                "message": "Your card may be blocked due to security reasons or suspicious activity. I can help you unblock it.",
-                "steps": [
-                    "Verify your identity",
-                    "Confirm recent transactions",
-                    "Unblock card if verified",
-                    "If fraud suspected, card will remain blocked"
-                ],
-                "reference": card.get("id", ""),
-                "can_resolve": False  # Requires security verification
-            },
-            "card declined": {
-                "message": "Card declines can happen due to insufficient funds, merchant restrictions, or security checks.",
-                "steps": [
-                    "Check account balance",
-                    "Verify transaction amount",
-                    "Try a different merchant",
-                    "Contact support if issue persists"
-                ],
-                "reference": card.get("id", ""),
-                "can_resolve": True
-            },
-            "lost or stolen card": {
-                "message": "If your card is lost or stolen, we need to block it immediately to prevent unauthorized use.",
-                "steps": [
-                    "Confirm card is lost/stolen",
-                    "Block card immediately",
-                    "Report to authorities if stolen",
-                    "Request new card replacement"
-                ],
-                "reference": card.get("id", ""),
-                "can_resolve": False  # Requires immediate action
-            },
-            "card activation": {
-                "message": "I can help you activate your card. You'll need your card details and may need to set a PIN.",
-                "steps": [
-                    "Provide card number and CVV",
-                    "Verify identity",
-                    "Set PIN if required",
-                    "Activate card"
-                ],
-                "reference": card.get("id", ""),
-                "can_resolve": True
-            },
-            "card limit increase": {
-                "message": "I can help you request a card limit increase. This requires a credit check and approval.",
-                "steps": [
-                    "Check current limit",
-                    "Review eligibility for increase",
-                    "Submit increase request",
-                    "Wait for approval (usually 24-48 hours)"
-                ],
-                "reference": card.get("id", ""),
-                "can_resolve": False  # Requires approval process
-            }
-        }
-        
-        issue_lower = issue_type.lower()
-        for key, guide in guides.items():
-            if key in issue_lower or issue_lower in key:
-                return guide
-        
-        return {
-            "message": "I can help you with card issues. Please describe the specific problem you're experiencing.",
-            "steps": ["Describe the issue", "I'll provide specific guidance"],
-            "reference": card.get("id", ""),
-            "can_resolve": True
-        }
+        card_id = context.cards[0].id if context.cards else ""
+        key = self._GUIDE_MATCHER.match(issue_type.lower())
+        guide = _DEFAULT_CARD_GUIDE if key is None else self._GUIDES[key]
+        # Only the reference varies, so the shared view is returned when there is none
+        return replace(guide, reference=card_id).as_dict() if card_id else guide.as_dict()
 
@@ -1,9 +1,27 @@
 """Financial insights workflow - provides insights on incoming, investment, and spending."""
 
-from typing import List, Dict, Any
+from dataclasses import dataclass
+from typing import ClassVar, Dict, Any, Mapping, Sequence, Tuple
 from langchain_core.runnables import RunnableConfig
 from engine.state import AgentState
-from .base import BaseWorkflow
+from .base import BaseWorkflow, ResolutionGuide
+from .keywords import GuideMatcher
+
+
+@dataclass(slots=True, frozen=True)
+class InsightsContext:
+    """Context returned by FinancialInsightsWorkflow.summarize."""
+    user_id: str
+    account_status: str
+
+
+# Shared read-only fallback guide; returned as-is on every unmatched request
+_DEFAULT_INSIGHTS_GUIDE = ResolutionGuide(
+    message="I can help you analyze your financial data. What specific insights would you like to see?",
+    steps=("Specify what you'd like to analyze", "I'll fetch and display the insights"),
+    reference="",
+    can_resolve=True
+)
 
 
 class FinancialInsightsWorkflow(BaseWorkflow):
@@ -17,86 +35,86 @@ class FinancialInsightsWorkflow(BaseWorkflow):
         "analyse incoming", "analyse spends", "analyse investment",
         "show insights", "financial overview", "spending breakdown"
     ]
+    # Phrases that route a chat message into the subgraph (subset of intent_keywords)
+    routing_keywords: ClassVar[Tuple[str, ...]] = (
+        "financial insights", "analyze", "analyse", "insights", "cash flow",
+        "spending analysis", "incoming analysis", "investment analysis",
+        "analyze incoming", "analyze spends", "analyze investment",
+        "show insights", "financial overview", "spending breakdown"
+    )
     description = "Provide financial insights and analysis for incoming, investment, and spending"
     
-    async def summarize(self, state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
+    async def summarize(self, state: AgentState, config: RunnableConfig) -> InsightsContext:
         """Get user's financial context."""
-        return {
-            "user_id": state.get("user_id", "demo_user"),
-            "account_status": "active"
-        }
+        return InsightsContext(user_id=state.get("user_id", "demo_user"), account_status="active")
     
-    def get_summary_message(self, context: Dict[str, Any]) -> str:
+    def get_summary_message(self, context: InsightsContext) -> str:
         """Generate financial insights greeting."""
         return "I can help you analyze your financial data! I can provide insights on your incoming transactions, investments, and spending patterns."
     
-    def get_question(self, context: Dict[str, Any]) -> str:
+    def get_question(self, context: InsightsContext) -> str:
         """Get the question to ask after summary."""
         return "What would you like to analyze?"
     
-    def get_suggestions(self, context: Dict[str, Any]) -> List[str]:
+    _SUGGESTIONS: ClassVar[Tuple[str, ...]] = (
+        "Show cash flow",
+        "Analyze incoming",
+        "Analyze spends",
+        "Analyze investment"
+    )
+    
+    def get_suggestions(self, context: InsightsContext) -> Sequence[str]:
         """Get common financial insights suggestions."""
-        return [
-            "Show cash flow",
-            "Analyze incoming",
-            "Analyze spends",
-            "Analyze investment"
-        ]
+        return self._SUGGESTIONS
+    
+    _GUIDES: ClassVar[Dict[str, ResolutionGuide]] = {
+        "analyze incoming": ResolutionGuide(
+            message="I'll analyze your incoming transactions and show you a breakdown by category.",
+            steps=(
+                "Fetching incoming transaction data",
+                "Calculating category breakdown",
+                "Displaying insights with charts"
+            ),
+            reference="",
+            can_resolve=True
+        ),
+        "analyze spends": ResolutionGuide(
+            message="I'll analyze your spending patterns and show you where your money is going.",
+            steps=(
+                "Fetching spending transaction data",
+                "Calculating spending categories",
+                "Displaying insights with charts"
+            ),
+            reference="",
+            can_resolve=True
+        ),
+        "analyze investment": ResolutionGuide(
+            message="I'll analyze your investment portfolio and show you the distribution.",
+            steps=(
+                "Fetching investment data",
+                "Calculating investment breakdown",
+                "Displaying insights with charts"
+            ),
+            reference="",
+            can_resolve=True
+        ),
+        "show cash flow": ResolutionGuide(
+            message="I'll show you a comprehensive cash flow overview with all categories.",
+            steps=(
+                "Fetching all financial data",
+                "Calculating cash flow metrics",
+                "Displaying comprehensive insights"
+            ),
+            reference="",
+            can_resolve=True
+        ),
+    }
+    
+    _GUIDE_MATCHER: ClassVar[GuideMatcher] = GuideMatcher(list(_GUIDES))
     
-    def get_resolution_guide(self, issue_type: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    def get_resolution_guide(self, issue_type: str, context: InsightsContext) -> Mapping[str, Any]:
         """Get guidance for financial insights requests."""
-        guides = {
-            "analyze incoming": {
-                "message": "I'll analyze your incoming transactions and show you a breakdown by category.",
-                "steps": [
-                    "Fetching incoming transaction data",
-                    "Calculating category breakdown",
-                    "Displaying insights with charts"
-                ],
-                "reference": "",
-                "can_resolve": True
-            },
-            "analyze spends": {
-                "message": "I'll analyze your spending patterns and show you where your money is going.",
-                "steps": [
-                    "Fetching spending transaction data",
-                    "Calculating spending categories",
-                    "Displaying insights with charts"
-                ],
-                "reference": "",
-                "can_resolve": True
-            },
-            "analyze investment": {
-                "message": "I'll analyze your investment portfolio and show you the distribution.",
-                "steps": [
-                    "Fetching investment data",
-                    "Calculating investment breakdown",
-                    "Displaying insights with charts"
-                ],
-                "reference": "",
-                "can_resolve": True
-            },
-            "show cash flow": {
-                "message": "I'll show you a comprehensive cash flow overview with all categories.",
-                "steps": [
-                    "Fetching all financial data",
-                    "Calculating cash flow metrics",
-                    "Displaying comprehensive insights"
-                ],
-                "reference": "",
-                "can_resolve": True
-            }
-        }
-        
-        issue_lower = issue_type.lower()
-        for key, guide in guides.items():
-            if key in issue_lower or issue_lower in key:
-                return guide
-        
-        return {
-            "message": "I can help you analyze your financial data. What specific insights would you like to see?",
-            "steps": ["Specify what you'd like to analyze", "I'll fetch and display the insights"],
-            "reference": "",
-            "can_resolve": True
-        }
+        key = self._GUIDE_MATCHER.match(issue_type.lower())
+        guide = _DEFAULT_INSIGHTS_GUIDE if key is None else self._GUIDES[key]
+        return guide.as_dict()
 
@@ -1,9 +1,19 @@
 """General enquiry workflow - handles miscellaneous questions."""
 
-from typing import List, Dict, Any
+from typing import Any, ClassVar, Dict, Mapping, Tuple, Sequence
 from langchain_core.runnables import RunnableConfig
 from engine.state import AgentState
-from .base import BaseWorkflow
+from .base import BaseWorkflow, ResolutionGuide
+from .keywords import GuideMatcher
+
+
+# Shared read-only fallback guide for unmatched enquiries
+_DEFAULT_GENERAL_GUIDE = ResolutionGuide(
+    message="I'm here to help! Please tell me more about what you need.",
+    steps=("Describe your enquiry", "I'll provide information or guidance"),
+    reference="",
+    can_resolve=True
+)
 
 
 class GeneralEnquiryWorkflow(BaseWorkflow):
@@ -14,6 +24,8 @@ class GeneralEnquiryWorkflow(BaseWorkflow):
         "help", "question", "enquiry", "information", "how to",
         "what is", "tell me about", "explain", "guide"
     ]
+    # Phrases that route a chat message into the subgraph (subset of intent_keywords)
+    routing_keywords: ClassVar[Tuple[str, ...]] = ("help", "question", "enquiry", "information", "how to")
     description = "Handle general enquiries and questions"
     
     async def summarize(self, state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
@@ -31,80 +43,78 @@ class GeneralEnquiryWorkflow(BaseWorkflow):
         """Get the question to ask after summary."""
         return "How can I assist you today?"
     
-    def get_suggestions(self, context: Dict[str, Any]) -> List[str]:
+    _SUGGESTIONS: ClassVar[Tuple[str, ...]] = (
+        "Account information",
+        "How to use features",
+        "Fees and charges",
+        "Security tips",
+        "Contact support"
+    )
+    
+    def get_suggestions(self, context: Dict[str, Any]) -> Sequence[str]:
         """Get common general enquiry suggestions."""
-        return [
-            "Account information",
-            "How to use features",
-            "Fees and charges",
-            "Security tips",
-            "Contact support"
-        ]
+        return self._SUGGESTIONS
+    
+    _GUIDES: ClassVar[Tuple[Tuple[str, ResolutionGuide], ...]] = (
+        ("account information", ResolutionGuide(
+            message="I can help you with account information. What specific details do you need?",
+            steps=(
+                "Specify what information you need",
+                "I'll provide the details",
+                "If sensitive, I'll guide you to secure channels"
+            ),
+            reference="",
+            can_resolve=True
+        )),
+        ("how to use features", ResolutionGuide(
+            message="I can guide you through our features. Which feature would you like to learn about?",
+            steps=(
+                "Specify the feature",
+                "I'll provide step-by-step guide",
+                "Answer any follow-up questions"
+            ),
+            reference="",
+            can_resolve=True
+        )),
+        ("fees and charges", ResolutionGuide(
+            message="I can explain our fees and charges. Which service are you asking about?",
+            steps=(
+                "Specify the service",
+                "I'll provide fee structure",
+                "Explain when charges apply"
+            ),
+            reference="",
+            can_resolve=True
+        )),
+        ("security tips", ResolutionGuide(
+            message="Security is important! Here are some tips: Never share your PIN, enable 2FA, monitor transactions regularly.",
+            steps=(
+                "Review security best practices",
+                "Enable security features",
+                "Set up transaction alerts"
+            ),
+            reference="",
+            can_resolve=True
+        )),
+        ("contact support", ResolutionGuide(
+            message="I can help you contact support. For urgent issues, you can create a support ticket or call our helpline.",
+            steps=(
+                "Describe your issue",
+                "I'll determine best support channel",
+                "Connect you with appropriate support"
+            ),
+            reference="",
+            can_resolve=True
+        )),
+    )
     
-    def get_resolution_guide(self, issue_type: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    _GUIDE_BY_KEY: ClassVar[Dict[str, ResolutionGuide]] = dict(_GUIDES)
+    _GUIDE_MATCHER: ClassVar[GuideMatcher] = GuideMatcher([key for key, _ in _GUIDES])
+    
+    def get_resolution_guide(self, issue_type: str, context: Dict[str, Any]) -> Mapping[str, Any]:
         """Get resolution guidance for general enquiries."""
-        guides = {
-            "account information": {
-                "message": "I can help you with account information. What specific details do you need?",
-                "steps": [
-                    "Specify what information you need",
-                    "I'll provide the details",
-                    "If sensitive, I'll guide you to secure channels"
-                ],
-                "reference": "",
-                "can_resolve": True
-            },
-            "how to use features": {
-                "message": "I can guide you through our features. Which feature would you like to learn about?",
-                "steps": [
-                    "Specify the feature",
-                    "I'll provide step-by-step guide",
-                    "Answer any follow-up questions"
-                ],
-                "reference": "",
-                "can_resolve": True
-            },
-            "fees and charges": {
-                "message": "I can explain our fees and charges. Which service are you asking about?",
-                "steps": [
-                    "Specify the service",
-                    "I'll provide fee structure",
-                    "Explain when charges apply"
-                ],
-                "reference": "",
-                "can_resolve": True
-            },
-            "security tips": {
-                "message": "Security is important! Here are some tips: Never share your PIN, enable 2FA, monitor transactions regularly.",
-                "steps": [
-                    "Review security best practices",
-                    "Enable security features",
-                    "Set up transaction alerts"
-                ],
-                "reference": "",
-                "can_resolve": True
-            },
-            "contact support": {
-                "message": "I can help you contact support. For urgent issues, you can create a support ticket or call our helpline.",
-                "steps": [
-                    "Describe your issue",
-                    "I'll determine best support channel",
-                    "Connect you with appropriate support"
-                ],
-                "reference": "",
-                "can_resolve": True
-            }
-        }
-        
-        issue_lower = issue_type.lower()
-        for key, guide in guides.items():
-            if key in issue_lower or issue_lower in key:
-                return guide
-        
-        return {
-            "message": "I'm here to help! Please tell me more about what you need.",
-            "steps": ["Describe your enquiry", "I'll provide information or guidance"],
-            "reference": "",
-            "can_resolve": True
-        }
+        key = self._GUIDE_MATCHER.match(issue_type.lower())
+        if key is None:
+            return _DEFAULT_GENERAL_GUIDE.as_dict()
+        return self._GUIDE_BY_KEY[key].as_dict()
 
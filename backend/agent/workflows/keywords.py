@@ -0,0 +1,112 @@
+"""Single-pass keyword matching for workflow intent detection and guide lookup.
+
+Workflows are checked in priority order and the first one with any keyword
+contained in the message wins. Instead of running one substring search per
+keyword per workflow, KeywordMatcher compiles every keyword into one regex and
+finds the best-priority hit in a single scan of the message.
+"""
+
+import re
+import sys
+from typing import Dict, Generic, Hashable, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+LabelT = TypeVar("LabelT", bound=Hashable)
+
+
+class KeywordMatcher(Generic[LabelT]):
+    """Map a message to the highest-priority label whose keyword it contains."""
+
+    def __init__(self, groups: Sequence[Tuple[LabelT, Iterable[str]]], ignore_case: bool = False):
+        """
+        Args:
+            groups: (label, keywords) pairs, highest priority first. Keywords are lower case.
+            ignore_case: Match messages of any case, so callers need not lower them first.
+                Otherwise match() expects an already lower-cased message.
+        """
+        self._labels: List[LabelT] = []
+        keyword_rank: Dict[str, int] = {}
+        for label, keywords in groups:
+            rank = len(self._labels)
+            self._labels.append(label)
+            for keyword in keywords:
+                # Interned so keywords shared between groups are one object
+                keyword_rank.setdefault(sys.intern(keyword), rank)
+
+        # Single-word keywords, probed by hash against the message tokens.
+        # With ignore_case a differently-cased token just misses here and is
+        # still found by the regex scan.
+        self._word_rank: Dict[str, int] = {kw: rank for kw, rank in keyword_rank.items() if kw.split() == [kw]}
+
+        # One named group per label, in priority order, so at each position the
+        # regex picks the best label with a keyword starting there and
+        # m.lastindex says which one; the lookahead makes finditer try every
+        # position, including overlapping keywords.
+        # _patterns[r] only holds labels ranked above r, which is all that is
+        # left to check once a rank-r word has been found.
+        by_rank: List[List[str]] = [[] for _ in self._labels]
+        for keyword, rank in keyword_rank.items():
+            by_rank[rank].append(keyword)
+        flags = re.IGNORECASE if ignore_case else 0
+        self._patterns: List[Optional[re.Pattern]] = []
+        self._group_ranks: List[List[int]] = []
+        for limit in range(len(self._labels) + 1):
+            ranks = [rank for rank in range(limit) if by_rank[rank]]
+            alternatives = "|".join(
+                f"(?P<g{rank}>" + "|".join(map(re.escape, by_rank[rank])) + ")" for rank in ranks
+            )
+            self._patterns.append(re.compile(f"(?=(?:{alternatives}))", flags) if ranks else None)
+            # m.lastindex is 1-based over the groups of this pattern
+            self._group_ranks.append([-1] + ranks)
+
+    def match(self, text: str) -> Optional[LabelT]:
+        """Return the highest-priority label with a keyword in text, or None."""
+        best = len(self._labels)
+        # Whole-word hits are substring hits too, so they bound the regex scan
+        for token in text.split():
+            rank = self._word_rank.get(token)
+            if rank is not None and rank < best:
+                best = rank
+        pattern = self._patterns[best]
+        if pattern is not None:
+            group_ranks = self._group_ranks[best]
+            for m in pattern.finditer(text):
+                rank = group_ranks[m.lastindex]
+                if rank < best:
+                    best = rank
+                    if best == 0:
+                        break
+        return self._labels[best] if best < len(self._labels) else None
+
+
+class GuideMatcher:
+    """
+    Pick the resolution guide key for an issue description.
+
+    Equivalent to returning the first key (in the given order) for which
+    `key in issue or issue in key`, but finds contained keys with one regex
+    scan and only falls back to `issue in key` checks for keys ahead of it.
+    """
+
+    def __init__(self, keys: Sequence[str]):
+        self._keys: List[str] = list(keys)
+        self._index: Dict[str, int] = {}
+        for i, key in enumerate(self._keys):
+            self._index.setdefault(key, i)
+        self._pattern = (
+            re.compile("(?=(" + "|".join(map(re.escape, self._index)) + "))") if self._index else None
+        )
+
+    def match(self, issue_lower: str) -> Optional[str]:
+        """Return the first matching guide key for a lower-cased issue, or None."""
+        # Exact key is the common case and bounds the search below
+        best = self._index.get(issue_lower, len(self._keys))
+        if self._pattern is not None:
+            for m in self._pattern.finditer(issue_lower):
+                best = min(best, self._index[m.group(1)])
+                if best == 0:
+                    break
+        # Earlier keys can still match by containing the issue text
+        for i in range(best):
+            if issue_lower in self._keys[i]:
+                return self._keys[i]
+        return self._keys[best] if best < len(self._keys) else None
@@ -1,9 +1,21 @@
 """Loan enquiry workflow - handles loan-related questions and applications."""
 
-from typing import List, Dict, Any
+from dataclasses import replace
+from typing import Any, ClassVar, Dict, FrozenSet, Mapping, Tuple, Sequence
 from langchain_core.runnables import RunnableConfig
 from engine.state import AgentState
-from .base import BaseWorkflow
+from ._cache import summary_cache
+from .base import BaseWorkflow, ResolutionGuide
+from .keywords import GuideMatcher
+
+
+# Shared read-only fallback guide for unmatched loan enquiries
+_DEFAULT_LOAN_GUIDE = ResolutionGuide(
+    message="I can help you with loan-related questions. What specific information do you need?",
+    steps=("Specify your loan enquiry", "I'll provide detailed information"),
+    reference="",
+    can_resolve=True
+)
 
 
 class LoanEnquiryWorkflow(BaseWorkflow):
@@ -14,20 +26,28 @@ class LoanEnquiryWorkflow(BaseWorkflow):
         "loan", "borrow", "credit", "apply for loan", "loan application",
         "loan status", "loan repayment", "loan interest", "loan eligibility"
     ]
+    # Phrases that route a chat message into the subgraph (subset of intent_keywords)
+    routing_keywords: ClassVar[Tuple[str, ...]] = ("loan", "borrow", "credit", "apply for loan", "loan application")
     description = "Handle loan enquiries, applications, and status checks"
     
     async def summarize(self, state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
         """Get user's loan information."""
-        # In production, this would call a tool to get loan details
-        return {
-            "active_loans": [],
-            "loan_eligibility": {
-                "eligible": True,
-                "max_amount": 50000,
-                "interest_rate": 12.5
-            },
-            "user_id": state.get("user_id", "demo_user")
-        }
+        user_id = state.get("user_id", "demo_user")
+        key = (self.name, user_id)
+        context = summary_cache.get(key)
+        if context is None:
+            # In production, this would call a tool to get loan details
+            context = {
+                "active_loans": [],
+                "loan_eligibility": {
+                    "eligible": True,
+                    "max_amount": 50000,
+                    "interest_rate": 12.5
+                },
+                "user_id": user_id
+            }
+            summary_cache.set(key, context)
+        return context
     
     def get_summary_message(self, context: Dict[str, Any]) -> str:
         """Generate loan summary message."""
@@ -40,86 +60,99 @@ class LoanEnquiryWorkflow(BaseWorkflow):
         """Get the question to ask after summary."""
         return "What would you like to know about loans?"
     
-    def get_suggestions(self, context: Dict[str, Any]) -> List[str]:
+    _SUGGESTIONS: ClassVar[Tuple[str, ...]] = (
+        "Apply for a loan",
+        "Check loan eligibility",
+        "Loan interest rates",
+        "Loan repayment schedule",
+        "Early repayment options"
+    )
+    
+    def get_suggestions(self, context: Dict[str, Any]) -> Sequence[str]:
         """Get common loan-related suggestions."""
-        return [
-            "Apply for a loan",
-            "Check loan eligibility",
-            "Loan interest rates",
-            "Loan repayment schedule",
-            "Early repayment options"
-        ]
+        return self._SUGGESTIONS
     
-    def get_resolution_guide(self, issue_type: str, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Get resolution guidance for loan enquiries."""
+    # Static guide skeletons; messages of _TEMPLATED_GUIDES take the eligibility figures
+    _GUIDES: ClassVar[Tuple[Tuple[str, ResolutionGuide], ...]] = (
+        ("apply for a loan", ResolutionGuide(
+            message="Great! You're eligible for loans up to {max_amount:,}. Current interest rate: {interest_rate}% APR.",
+            steps=(
+                "Review loan terms and interest rates",
+                "Choose loan amount and tenure",
+                "Complete application form",
+                "Submit required documents"
+            ),
+            reference="",
+            can_resolve=False  # Requires application process
+        )),
+        ("check loan eligibility", ResolutionGuide(
+            message="Based on your account, you're eligible for loans up to {max_amount:,} with {interest_rate}% APR.",
+            steps=(
+                "Review eligibility criteria",
+                "Check maximum loan amount",
+                "Review interest rates",
+                "Start application if interested"
+            ),
+            reference="",
+            can_resolve=True
+        )),
+        ("loan interest rates", ResolutionGuide(
+            message="Our current loan interest rates start at {interest_rate}% APR. Rates vary based on loan amount, tenure, and credit profile.",
+            steps=(
+                "Review interest rate structure",
+                "Calculate total interest for your loan amount",
+                "Compare with other options",
+                "Apply if rates are acceptable"
+            ),
+            reference="",
+            can_resolve=True
+        )),
+        ("loan repayment schedule", ResolutionGuide(
+            message="I can show you your loan repayment schedule. Please provide your loan account number or I can check your active loans.",
+            steps=(
+                "Provide loan account number",
+                "I'll fetch your repayment schedule",
+                "Review upcoming payments and dates"
+            ),
+            reference="",
+            can_resolve=True
+        )),
+        ("early repayment options", ResolutionGuide(
+            message="You can make early repayments to reduce interest. There may be a small processing fee. I can help you calculate savings.",
+            steps=(
+                "Review early repayment terms",
+                "Calculate interest savings",
+                "Check processing fees",
+                "Initiate early repayment if desired"
+            ),
+            reference="",
+            can_resolve=True
+        )),
+    )
+    
+    _GUIDE_BY_KEY: ClassVar[Dict[str, ResolutionGuide]] = dict(_GUIDES)
+    _GUIDE_MATCHER: ClassVar[GuideMatcher] = GuideMatcher([key for key, _ in _GUIDES])
+    
+    _TEMPLATED_GUIDES: ClassVar[FrozenSet[str]] = frozenset({
+        "apply for a loan", "check loan eligibility", "loan interest rates"
+    })
+    
+    @staticmethod
+    def _format_dynamic(guide: ResolutionGuide, context: Dict[str, Any]) -> Mapping[str, Any]:
+        """Fill the user's eligibility figures into a templated guide."""
         eligibility = context.get("loan_eligibility", {})
-        
-        guides = {
-            "apply for a loan": {
-                "message": f"Great! You're eligible for loans up to {eligibility.get('max_amount', 0):,}. Current interest rate: {eligibility.get('interest_rate', 0)}% APR.",
-                "steps": [
-                    "Review loan terms and interest rates",
-                    "Choose loan amount and tenure",
-                    "Complete application form",
-                    "Submit required documents"
-                ],
-                "reference": "",
-                "can_resolve": False  # Requires application process
-            },
-            "check loan eligibility": {
-                "message": f"Based on your account, you're eligible for loans up to {eligibility.get('max_amount', 0):,} with {eligibility.get('interest_rate', 0)}% APR.",
-                "steps": [
-                    "Review eligibility criteria",
-                    "Check maximum loan amount",
-                    "Review interest rates",
-                    "Start application if interested"
-                ],
-                "reference": "",
-                "can_resolve": True
-            },
-            "loan interest rates": {
-                "message": f"Our current loan interest rates start at {eligibility.get('interest_rate', 0)}% APR. Rates vary based on loan amount, tenure, and credit profile.",
-                "steps": [
-                    "Review interest rate structure",
-                    "Calculate total interest for your loan amount",
-                    "Compare with other options",
-                    "Apply if rates are acceptable"
-                ],
-                "reference": "",
-                "can_resolve": True
-            },
-            "loan repayment schedule": {
-                "message": "I can show you your loan repayment schedule. Please provide your loan account number or I can check your active loans.",
-                "steps": [
-                    "Provide loan account number",
-                    "I'll fetch your repayment schedule",
-                    "Review upcoming payments and dates"
-                ],
-                "reference": "",
-                "can_resolve": True
-            },
-            "early repayment options": {
-                "message": "You can make early repayments to reduce interest. There may be a small processing fee. I can help you calculate savings.",
-                "steps": [
-                    "Review early repayment terms",
-                    "Calculate interest savings",
-                    "Check processing fees",
-                    "Initiate early repayment if desired"
-                ],
-                "reference": "",
-                "can_resolve": True
-            }
-        }
-        
-        issue_lower = issue_type.lower()
-        for key, guide in guides.items():
-            if key in issue_lower or issue_lower in key:
-                return guide
-        
-        return {
-            "message": "I can help you with loan-related questions. What specific information do you need?",
-            "steps": ["Specify your loan enquiry", "I'll provide detailed information"],
-            "reference": "",
-            "can_resolve": True
-        }
+        message = guide.message.format(
+            max_amount=eligibility.get("max_amount", 0),
+            interest_rate=eligibility.get("interest_rate", 0),
+        )
+        return replace(guide, message=message).as_dict()
+    
+    def get_resolution_guide(self, issue_type: str, context: Dict[str, Any]) -> Mapping[str, Any]:
+        """Get resolution guidance for loan enquiries."""
+        key = self._GUIDE_MATCHER.match(issue_type.lower())
+        if key is None:
+            return _DEFAULT_LOAN_GUIDE.as_dict()
+        if key in self._TEMPLATED_GUIDES:
+            return self._format_dynamic(self._GUIDE_BY_KEY[key], context)
+        return self._GUIDE_BY_KEY[key].as_dict()
 
@@ -1,9 +1,21 @@
 """Refund workflow - handles refund requests and enquiries."""
 
-from typing import List, Dict, Any
+from dataclasses import replace
+from typing import Any, ClassVar, Dict, FrozenSet, Mapping, Tuple, Sequence
 from langchain_core.runnables import RunnableConfig
 from engine.state import AgentState
-from .base import BaseWorkflow
+from ._cache import summary_cache
+from .base import BaseWorkflow, ResolutionGuide
+from .keywords import GuideMatcher
+
+
+# Shared read-only fallback guide for unmatched refund requests
+_DEFAULT_REFUND_GUIDE = ResolutionGuide(
+    message="I can help you with refunds. Please provide more details about your refund request.",
+    steps=("Provide transaction details", "Specify refund reason"),
+    reference="",
+    can_resolve=True
+)
 
 
 class RefundWorkflow(BaseWorkflow):
@@ -14,25 +26,33 @@ class RefundWorkflow(BaseWorkflow):
         "refund", "money back", "return payment", "get refund",
         "refund request", "cancel payment", "reverse payment"
     ]
+    # Phrases that route a chat message into the subgraph (subset of intent_keywords)
+    routing_keywords: ClassVar[Tuple[str, ...]] = ("refund", "money back", "return payment", "get refund")
     description = "Handle refund requests and enquiries"
     
     async def summarize(self, state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
         """Get refund-eligible transactions or refund status."""
-        # In production, this would call a tool to get refund-eligible transactions
-        # For now, return mock data
-        return {
-            "refund_eligible_transactions": [
-                {
-                    "id": "txn_1",
-                    "merchant": "Coffee Shop",
-                    "amount": 50.0,
-                    "date": "2025-11-22",
-                    "refund_status": "eligible",
-                    "refund_deadline": "2025-12-22"
-                }
-            ],
-            "user_id": state.get("user_id", "demo_user")
-        }
+        user_id = state.get("user_id", "demo_user")
+        key = (self.name, user_id)
+        context = summary_cache.get(key)
+        if context is None:
+            # In production, this would call a tool to get refund-eligible transactions
+            # For now, return mock data
+            context = {
+                "refund_eligible_transactions": [
+                    {
+                        "id": "txn_1",
+                        "merchant": "Coffee Shop",
+                        "amount": 50.0,
+                        "date": "2025-11-22",
+                        "refund_status": "eligible",
+                        "refund_deadline": "2025-12-22"
+                    }
+                ],
+                "user_id": user_id
+            }
+            summary_cache.set(key, context)
+        return context
     
     def get_summary_message(self, context: Dict[str, Any]) -> str:
         """Generate refund summary message."""
@@ -46,82 +66,91 @@ class RefundWorkflow(BaseWorkflow):
         """Get the question to ask after summary."""
         return "What type of refund are you looking for?"
     
-    def get_suggestions(self, context: Dict[str, Any]) -> List[str]:
+    _SUGGESTIONS: ClassVar[Tuple[str, ...]] = (
+        "Refund for cancelled order",
+        "Refund for service not received",
+        "Refund for wrong amount",
+        "Check refund status",
+        "Refund policy information"
+    )
+    
+    def get_suggestions(self, context: Dict[str, Any]) -> Sequence[str]:
         """Get common refund-related suggestions."""
-        return [
-            "Refund for cancelled order",
-            "Refund for service not received",
-            "Refund for wrong amount",
-            "Check refund status",
-            "Refund policy information"
-        ]
+        return self._SUGGESTIONS
     
-    def get_resolution_guide(self, issue_type: str, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Get resolution guidance for refund issues."""
+    # Static guide skeletons; _REFERENCED_GUIDES carry the eligible transaction id
+    _GUIDES: ClassVar[Tuple[Tuple[str, ResolutionGuide], ...]] = (
+        ("refund for cancelled order", ResolutionGuide(
+            message="For cancelled orders, refunds are typically processed automatically within 5-7 business days. If it's been longer, contact the merchant directly.",
+            steps=(
+                "Check your transaction history for refund status",
+                "Wait 5-7 business days for automatic processing",
+                "If not received, contact the merchant with transaction details"
+            ),
+            reference="",
+            can_resolve=True
+        )),
+        ("refund for service not received", ResolutionGuide(
+            message="Contact the merchant directly with your transaction details. They can process the refund or you can dispute the charge.",
+            steps=(
+                "Gather transaction details (date, amount, merchant)",
+                "Contact merchant customer support",
+                "If merchant unresponsive, you can dispute the charge"
+            ),
+            reference="",
+            can_resolve=True
+        )),
+        ("refund for wrong amount", ResolutionGuide(
+            message="Contact the merchant to correct the amount. If they agree, they can process a partial refund.",
+            steps=(
+                "Calculate the correct amount vs charged amount",
+                "Contact merchant with transaction details",
+                "Request partial refund for difference"
+            ),
+            reference="",
+            can_resolve=True
+        )),
+        ("check refund status", ResolutionGuide(
+            message="I can check the status of your refund. Please provide the transaction ID or I can show your recent transactions.",
+            steps=(
+                "Provide transaction ID or date",
+                "I'll check the refund status",
+                "If pending, I'll provide expected timeline"
+            ),
+            reference="",
+            can_resolve=True
+        )),
+        ("refund policy information", ResolutionGuide(
+            message="Our refund policy: Full refunds available within 30 days for eligible transactions. Merchant refunds may take 5-7 business days.",
+            steps=(
+                "Review refund eligibility (30-day window)",
+                "Check if transaction qualifies",
+                "Contact merchant if within policy"
+            ),
+            reference="",
+            can_resolve=True
+        )),
+    )
+    
+    _GUIDE_BY_KEY: ClassVar[Dict[str, ResolutionGuide]] = dict(_GUIDES)
+    _GUIDE_MATCHER: ClassVar[GuideMatcher] = GuideMatcher([key for key, _ in _GUIDES])
+    
+    _REFERENCED_GUIDES: ClassVar[FrozenSet[str]] = frozenset({
+        "refund for cancelled order", "refund for service not received", "refund for wrong amount"
+    })
+    
+    @staticmethod
+    def _format_dynamic(guide: ResolutionGuide, context: Dict[str, Any]) -> Mapping[str, Any]:
+        """Fill the first refund-eligible transaction id into a guide's reference."""
         transactions = context.get("refund_eligible_transactions", [])
-        
-        guides = {
-            "refund for cancelled order": {
-                "message": "For cancelled orders, refunds are typically processed automatically within 5-7 business days. If it's been longer, contact the merchant directly.",
-                "steps": [
-                    "Check your transaction history for refund status",
-                    "Wait 5-7 business days for automatic processing",
-                    "If not received, contact the merchant with transaction details"
-                ],
-                "reference": transactions[0].get("id", "") if transactions else "",
-                "can_resolve": True
-            },
-            "refund for service not received": {
-                "message": "Contact the merchant directly with your transaction details. They can process the refund or you can dispute the charge.",
-                "steps": [
-                    "Gather transaction details (date, amount, merchant)",
-                    "Contact merchant customer support",
-                    "If merchant unresponsive, you can dispute the charge"
-                ],
-                "reference": transactions[0].get("id", "") if transactions else "",
-                "can_resolve": True
-            },
-            "refund for wrong amount": {
-                "message": "Contact the merchant to correct the amount. If they agree, they can process a partial refund.",
-                "steps": [
-                    "Calculate the correct amount vs charged amount",
-                    "Contact merchant with transaction details",
-                    "Request partial refund for difference"
-                ],
-                "reference": transactions[0].get("id", "") if transactions else "",
-                "can_resolve": True
-            },
-            "check refund status": {
-                "message": "I can check the status of your refund. Please provide the transaction ID or I can show your recent transactions.",
-                "steps": [
-                    "Provide transaction ID or date",
-                    "I'll check the refund status",
-                    "If pending, I'll provide expected timeline"
-                ],
-                "reference": "",
-                "can_resolve": True
-            },
-            "refund policy information": {
-                "message": "Our refund policy: Full refunds available within 30 days for eligible transactions. Merchant refunds may take 5-7 business days.",
-                "steps": [
-                    "Review refund eligibility (30-day window)",
-                    "Check if transaction qualifies",
-                    "Contact merchant if within policy"
-                ],
-                "reference": "",
-                "can_resolve": True
-            }
-        }
-        
-        issue_lower = issue_type.lower()
-        for key, guide in guides.items():
-            if key in issue_lower or issue_lower in key:
-                return guide
-        
-        return {
-            "message": "I can help you with refunds. Please provide more details about your refund request.",
-            "steps": ["Provide transaction details", "Specify refund reason"],
-            "reference": "",
-            "can_resolve": True
-        }
+        return replace(guide, reference=transactions[0].get("id", "") if transactions else "").as_dict()
+    
+    def get_resolution_guide(self, issue_type: str, context: Dict[str, Any]) -> Mapping[str, Any]:
+        """Get resolution guidance for refund issues."""
+        key = self._GUIDE_MATCHER.match(issue_type.lower())
+        if key is None:
+            return _DEFAULT_REFUND_GUIDE.as_dict()
+        if key in self._REFERENCED_GUIDES:
+            return self._format_dynamic(self._GUIDE_BY_KEY[key], context)
+        return self._GUIDE_BY_KEY[key].as_dict()
 
@@ -1,56 +1,83 @@
 """LangGraph subgraphs for guided support workflows."""
 
-from typing import Optional
+import importlib
+import logging
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional
+
+from .. import get_all_workflows
+from ..keywords import KeywordMatcher
+
+logger = logging.getLogger(__name__)
 
-# Import subgraph builders
-from .transaction_help_graph import build_transaction_help_subgraph
-from .refund_graph import build_refund_subgraph
-from .loan_enquiry_graph import build_loan_enquiry_graph
-from .card_issue_graph import build_card_issue_subgraph
-from .general_enquiry_graph import build_general_enquiry_subgraph
-from .financial_insights_graph import build_financial_insights_subgraph
 
 def detect_workflow_intent(user_message: str) -> Optional[str]:
     """
     Detect which workflow subgraph to use based on user message.
     Returns workflow name or None.
     """
-    user_lower = user_message.lower()
-    
-    # Priority order: most specific first
-    if any(kw in user_lower for kw in ["help with transaction", "transaction issue", "payment problem", "transaction to", "payment to"]):
-        return "transaction_help"
-    elif any(kw in user_lower for kw in ["financial insights", "analyze", "analyse", "insights", "cash flow", "spending analysis", "incoming analysis", "investment analysis", "analyze incoming", "analyze spends", "analyze investment", "show insights", "financial overview", "spending breakdown"]):
-        return "financial_insights"
-    elif any(kw in user_lower for kw in ["refund", "money back", "return payment", "get refund"]):
-        return "refund"
-    elif any(kw in user_lower for kw in ["loan", "borrow", "credit", "apply for loan", "loan application"]):
-        return "loan_enquiry"
-    elif any(kw in user_lower for kw in ["card", "debit card", "credit card", "card blocked", "card not working"]):
-        return "card_issue"
-    elif any(kw in user_lower for kw in ["help", "question", "enquiry", "information", "how to"]):
-        return "general_enquiry"
-    
-    return None
+    # Detection is a pure function of the normalized text, so repeated
+    # messages (retries, multi-turn loops) are answered from the cache
+    return _detect_workflow_intent(user_message.strip())
+
+
+# Built from each workflow class's routing_keywords; the registry iterates in
+# detection priority order, so the classes are the single source of truth.
+# One case-insensitive regex with a named group per workflow; the message is
+# scanned once and never lower-cased.
+_intent_matcher: KeywordMatcher[str] = KeywordMatcher(
+    [(name, workflow_class.routing_keywords) for name, workflow_class in get_all_workflows().items()],
+    ignore_case=True,
+)
+
+
+@lru_cache(maxsize=1024)
+def _detect_workflow_intent(user_message: str) -> Optional[str]:
+    """Keyword-based detection on a stripped message (any case)."""
+    return _intent_matcher.match(user_message)
+
+# Subgraph builders, keyed by workflow name, as (module, function). Modules are
+# imported on first use, so a process only loads the subgraphs it runs.
+_BUILDER_PATHS = {
+    "transaction_help": (".transaction_help_graph", "build_transaction_help_subgraph"),
+    "refund": (".refund_graph", "build_refund_subgraph"),
+    "loan_enquiry": (".loan_enquiry_graph", "build_loan_enquiry_graph"),
+    "card_issue": (".card_issue_graph", "build_card_issue_subgraph"),
+    "general_enquiry": (".general_enquiry_graph", "build_general_enquiry_subgraph"),
+    "financial_insights": (".financial_insights_graph", "build_financial_insights_subgraph"),
+}
+
+@lru_cache(maxsize=None)
+def _compile(workflow_name: str):
+    """Import, build and compile a workflow subgraph; compiled graphs are stateless, so one per process."""
+    module_path, builder_name = _BUILDER_PATHS[workflow_name]
+    builder = getattr(importlib.import_module(module_path, package=__name__), builder_name)
+    return builder()
+
 
 def get_workflow_subgraph(workflow_name: str):
     """
     Get the compiled subgraph for a workflow.
     Returns None if workflow not found.
     """
-    # Subgraph builders
-    subgraph_builders = {
-        "transaction_help": build_transaction_help_subgraph,
-        "refund": build_refund_subgraph,
-        "loan_enquiry": build_loan_enquiry_graph,
-        "card_issue": build_card_issue_subgraph,
-        "general_enquiry": build_general_enquiry_subgraph,
-        "financial_insights": build_financial_insights_subgraph,
-    }
-    
-    builder = subgraph_builders.get(workflow_name)
-    if builder:
-        return builder()
+    if workflow_name in _BUILDER_PATHS:
+        return _compile(workflow_name)
     
     return None
 
+
+def compile_workflow_subgraphs(workflow_names: Iterable[str]) -> Dict[str, Any]:
+    """
+    Eagerly compile the given subgraphs (e.g. at startup).
+    A subgraph that fails to build is logged and left out instead of failing the rest.
+    """
+    compiled = {}
+    for workflow_name in workflow_names:
+        try:
+            subgraph = get_workflow_subgraph(workflow_name)
+        except Exception as e:
+            logger.error("Failed to compile %s subgraph: %s", workflow_name, e, exc_info=True)
+            continue
+        if subgraph is not None:
+            compiled[workflow_name] = subgraph
+    return compiled
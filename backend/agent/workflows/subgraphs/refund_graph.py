@@ -1,51 +1,32 @@
 """Refund workflow as LangGraph subgraph."""
 
-from langgraph.graph import StateGraph, START, END
-from langchain_core.runnables import RunnableConfig
-from langchain_core.messages import AIMessage
-from engine.state import AgentState
-from copilotkit.langgraph import copilotkit_emit_message
-import logging
-
-logger = logging.getLogger(__name__)
-
-
-async def summarize_refund_node(state: AgentState, config: RunnableConfig):
-    """Step 1: Get refund-eligible transactions and summarize."""
-    logger.debug("Refund subgraph: Starting summarization")
-    # Placeholder - in production, call refund tools
-    state["refund_context"] = {
-        "refund_eligible_transactions": [
-            {
-                "id": "txn_1",
-                "merchant": "Coffee Shop",
-                "amount": 50.0,
-                "date": "2025-11-22",
-                "refund_status": "eligible"
-            }
-        ]
-    }
-    state["current_workflow"] = "refund"
-    state["workflow_step"] = "summarized"
-    
-    summary_msg = "You have 1 transaction(s) that may be eligible for refund. Let me help you with your refund request.\n\nWhat type of refund are you looking for?"
-    state["messages"].append(AIMessage(content=summary_msg))
-    await copilotkit_emit_message(config, summary_msg)
-    
-    # Mark workflow as completed and clear current_workflow
-    state["workflow_step"] = "completed"
-    state["current_workflow"] = None
-    
-    logger.debug("Refund subgraph: Summarization complete, returning to main graph")
-    
-    return state
+from typing import Final
 
+from .shared_nodes import make_summary_subgraph
+
+# Placeholder - in production, call refund tools
+# Shared by every request and assigned into state by reference: treat it as
+# read-only. Only the list containers are tuples; the dicts stay mutable so the
+# checkpoint serializer can handle them.
+REFUND_CONTEXT = {
+    "refund_eligible_transactions": (
+        {
+            "id": "txn_1",
+            "merchant": "Coffee Shop",
+            "amount": 50.0,
+            "date": "2025-11-22",
+            "refund_status": "eligible"
+        },
+    )
+}
+
+REFUND_SUMMARY_MSG: Final[str] = "You have 1 transaction(s) that may be eligible for refund. Let me help you with your refund request.\n\nWhat type of refund are you looking for?"
 
-def build_refund_subgraph():
-    """Build and compile the refund subgraph."""
-    graph = StateGraph(AgentState)
-    graph.add_node("summarize", summarize_refund_node)
-    graph.add_edge(START, "summarize")
-    graph.add_edge("summarize", END)
-    return graph.compile()
 
+# Compiled once at import; the graph is stateless, so every caller shares it
+_GRAPH: Final = make_summary_subgraph("refund", REFUND_SUMMARY_MSG, "refund_context", REFUND_CONTEXT)
+
+
+def build_refund_subgraph():
+    """Return the compiled refund subgraph."""
+    return _GRAPH
@@ -1,10 +1,66 @@
 """Shared nodes for workflow subgraphs."""
 
+import logging
+import re
+from typing import Any, Callable, Dict, Final, Optional, Union
+from langgraph.graph import StateGraph, START, END
 from langchain_core.runnables import RunnableConfig
-from langchain_core.messages import AIMessage
+from langchain_core.messages import AIMessage, HumanMessage
 from engine.state import AgentState
 from copilotkit.langgraph import copilotkit_emit_message
 
+logger = logging.getLogger(__name__)
+
+# Phrases that tell check_resolution_node the user's issue is resolved
+_RESOLVED_KEYWORDS = ("resolved", "fixed", "worked", "thanks", "okay", "got it")
+# Whole words only ("thanksgiving" is not "thanks"), in any case, so the
+# message is searched as-is without a lower-cased copy
+_RESOLVED_RE = re.compile(r"\b(?:" + "|".join(map(re.escape, _RESOLVED_KEYWORDS)) + r")\b", re.IGNORECASE)
+_RESOLVED_MSG: Final[str] = "Great! I'm glad we could help. Is there anything else you need?"
+
+# Workflow context: a constant dict, or a function of the state for per-user context
+SubgraphContext = Union[Dict[str, Any], Callable[[AgentState], Dict[str, Any]]]
+
+
+def make_summary_subgraph(
+    workflow_name: str,
+    summary_msg: str,
+    context_key: Optional[str] = None,
+    context_value: Optional[SubgraphContext] = None,
+):
+    """
+    Build and compile a summarize-only workflow subgraph (START -> summarize -> END).
+
+    The summarize node posts summary_msg, returns the workflow context under
+    context_key (if given), marks the workflow completed and hands control back
+    to the main graph's chat_node.
+    """
+    async def summarize(state: AgentState, config: RunnableConfig):
+        """Step 1: Post the summary and hand back to the main graph.
+        
+        Returns only the keys it changes; the messages reducer appends the summary.
+        """
+        # Awaited so the summary reaches the client before chat_node's reply
+        await copilotkit_emit_message(config, summary_msg)
+        
+        # The workflow is completed in this single step, so current_workflow is cleared
+        update = {
+            "messages": [AIMessage(content=summary_msg)],
+            "current_workflow": None,
+            "workflow_step": "completed",
+        }
+        if context_key is not None:
+            update[context_key] = context_value(state) if callable(context_value) else context_value
+        return update
+
+    graph = StateGraph(AgentState)
+    graph.add_node("summarize", summarize)
+    graph.add_edge(START, "summarize")
+    graph.add_edge("summarize", END)
+    # Logged once per compile; the node itself logs nothing per request
+    logger.debug("%s subgraph compiled", workflow_name)
+    return graph.compile()
+
 
 async def escalate_to_ticket_node(state: AgentState, config: RunnableConfig):
     """Shared node for escalating to ticket creation."""
@@ -17,25 +73,17 @@ async def escalate_to_ticket_node(state: AgentState, config: RunnableConfig):
 async def check_resolution_node(state: AgentState, config: RunnableConfig):
     """Check if issue has been resolved or needs escalation."""
     messages = state.get("messages", [])
-    last_user_msg = None
+    last_user_msg = next((msg for msg in reversed(messages) if isinstance(msg, HumanMessage)), None)
     
-    for msg in reversed(messages):
-        from langchain_core.messages import HumanMessage
-        if isinstance(msg, HumanMessage):
-            last_user_msg = str(msg.content).lower()
-            break
-    
-    if last_user_msg:
+    if last_user_msg is not None:
+        content = last_user_msg.content
         # Check if user indicates resolution
-        resolved_keywords = ["resolved", "fixed", "worked", "thanks", "okay", "got it"]
-        if any(kw in last_user_msg for kw in resolved_keywords):
+        if _RESOLVED_RE.search(content if isinstance(content, str) else str(content)):
             state["resolution_attempted"] = True
-            resolved_msg = "Great! I'm glad we could help. Is there anything else you need?"
-            state["messages"].append(AIMessage(content=resolved_msg))
-            await copilotkit_emit_message(config, resolved_msg)
+            state["messages"].append(AIMessage(content=_RESOLVED_MSG))
+            await copilotkit_emit_message(config, _RESOLVED_MSG)
             return state
     
     # If not resolved, mark for potential escalation
     state["resolution_attempted"] = False
     return state
-
@@ -1,10 +1,12 @@
 """Transaction help workflow as LangGraph subgraph."""
 
+from typing import Final
+
 from langgraph.graph import StateGraph, START, END
 from langchain_core.runnables import RunnableConfig
 from langchain_core.messages import AIMessage
 from engine.state import AgentState
-from agent.tools import get_transaction_details
+from .._txn_utils import extract_txn_id, fetch_or_fallback, format_summary
 from copilotkit.langgraph import copilotkit_emit_message
 import logging
 
@@ -19,75 +21,26 @@ async def summarize_transaction_node(state: AgentState, config: RunnableConfig):
     to chat_node for continued conversation and guidance.
     """
     logger.debug("Transaction help subgraph: Starting summarization")
-    messages = state.get("messages", [])
-    transaction_id = ""
-    
-    # Extract transaction ID from recent messages
-    for msg in reversed(messages[-5:]):
-        content = str(msg.content).lower()
-        if "txn_" in content:
-            import re
-            match = re.search(r'txn_\d+', content)
-            if match:
-                transaction_id = match.group(0)
-                break
-    
-    # Call tool directly (in production, this would go through ToolNode)
-    try:
-        logger.debug(f"Fetching transaction details for ID: {transaction_id}")
-        transaction = get_transaction_details.invoke({
-            "user_id": state.get("user_id", "demo_user"),
-            "transaction_id": transaction_id
-        })
-    except Exception as e:
-        logger.warning(f"Failed to fetch transaction details: {e}, using fallback")
-        # Fallback
-        from datetime import datetime, timedelta
-        transaction = {
-            "id": "txn_1",
-            "date": (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d"),
-            "merchant": "Coffee Shop",
-            "amount": -50.0,
-            "currency": "USD",
-            "status": "completed",
-            "reference": "532300764753"
-        }
-    
-    # Update state with transaction context
-    state["transaction_context"] = transaction
-    state["current_workflow"] = "transaction_help"
-    state["workflow_step"] = "summarized"
-    
-    # Format summary message
-    amount = abs(transaction.get("amount", 0))
-    currency = transaction.get("currency", "USD")
-    merchant = transaction.get("merchant", "merchant")
-    date = transaction.get("date", "")
-    
-    from datetime import datetime
-    try:
-        date_obj = datetime.strptime(date, "%Y-%m-%d")
-        formatted_date = date_obj.strftime("%d %b %Y")
-    except:
-        formatted_date = date
-    
-    summary_msg = f"Good news: your payment of {amount:.2f} {currency} to {merchant} on {formatted_date} was successful.\n\nUTR: {transaction.get('reference', 'N/A')}\n\nTell us what's wrong"
+    transaction_id = extract_txn_id(state.get("messages", []))
+    transaction = fetch_or_fallback(state.get("user_id", "demo_user"), transaction_id)
     
-    # Add summary message
-    state["messages"].append(AIMessage(content=summary_msg))
+    summary_msg = f"{format_summary(transaction)}\n\nUTR: {transaction.get('reference', 'N/A')}\n\nTell us what's wrong"
     await copilotkit_emit_message(config, summary_msg)
     
-    # Mark workflow as completed and clear current_workflow to allow new intent detection
-    # The workflow context is preserved in transaction_context for chat_node to use
-    state["workflow_step"] = "completed"
-    state["current_workflow"] = None  # Clear to allow new workflows
-    
     logger.debug("Transaction help subgraph: Summarization complete, returning to main graph")
     
-    return state
+    # Partial update: add_messages appends the summary once. The workflow is
+    # completed and current_workflow cleared to allow new intent detection;
+    # the context is preserved in transaction_context for chat_node to use
+    return {
+        "messages": [AIMessage(content=summary_msg)],
+        "transaction_context": transaction,
+        "current_workflow": None,
+        "workflow_step": "completed",
+    }
 
 
-def build_transaction_help_subgraph():
+def _build():
     """Build and compile the transaction help subgraph.
     
     This subgraph summarizes the transaction and returns control to chat_node.
@@ -105,3 +58,11 @@ def build_transaction_help_subgraph():
     
     return graph.compile()
 
+
+# Compiled once at import; the graph is stateless, so every caller shares it
+_GRAPH: Final = _build()
+
+
+def build_transaction_help_subgraph():
+    """Return the compiled transaction help subgraph."""
+    return _GRAPH
@@ -1,10 +1,20 @@
 """Transaction help workflow - refactored from existing implementation."""
 
-from typing import List, Dict, Any
+from dataclasses import replace
+from typing import Dict, Any, ClassVar, Mapping, Sequence, Tuple
 from langchain_core.runnables import RunnableConfig
 from engine.state import AgentState
-from .base import BaseWorkflow
-from agent.tools import get_transaction_details
+from .base import BaseWorkflow, ResolutionGuide
+from .keywords import GuideMatcher
+from ._txn_utils import extract_txn_id, fetch_or_fallback, format_summary
+
+# Fallback guide template for unmatched transaction issues
+_DEFAULT_TRANSACTION_GUIDE = ResolutionGuide(
+    message="Contact {merchant} with UTR: {reference} for assistance.",
+    steps=("Contact {merchant} customer support", "Provide UTR: {reference}"),
+    reference="",
+    can_resolve=True
+)
 
 
 class TransactionHelpWorkflow(BaseWorkflow):
@@ -15,46 +25,17 @@ class TransactionHelpWorkflow(BaseWorkflow):
         "help with transaction", "transaction issue", "payment problem",
         "transaction to", "payment to", "help with my transaction"
     ]
+    # Phrases that route a chat message into the subgraph (subset of intent_keywords)
+    routing_keywords: ClassVar[Tuple[str, ...]] = (
+        "help with transaction", "transaction issue", "payment problem", "transaction to", "payment to"
+    )
     description = "Help users resolve transaction-related issues"
     
     async def summarize(self, state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
         """Get transaction details."""
-        # Extract transaction_id from conversation if available
-        messages = state.get("messages", [])
-        transaction_id = ""
-        
-        # Try to extract transaction ID from recent messages
-        for msg in reversed(messages[-5:]):  # Check last 5 messages
-            content = str(msg.content).lower()
-            if "txn_" in content:
-                # Extract transaction ID (simplified - in production, use better parsing)
-                import re
-                match = re.search(r'txn_\d+', content)
-                if match:
-                    transaction_id = match.group(0)
-                    break
-        
-        # In production, the tool would be called through the graph
-        # For now, we'll call it directly (this should be refactored to use graph tools)
-        # The workflow router will handle tool calls through the graph
-        try:
-            result = get_transaction_details.invoke({
-                "user_id": state.get("user_id", "demo_user"),
-                "transaction_id": transaction_id
-            })
-        except Exception:
-            # Fallback to mock data if tool call fails
-            from datetime import datetime, timedelta
-            result = {
-                "id": "txn_1",
-                "date": (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d"),
-                "merchant": "Coffee Shop",
-                "description": "Coffee",
-                "amount": -50.0,
-                "currency": "USD",
-                "status": "completed",
-                "reference": "532300764753"
-            }
+        # Extract transaction_id from the recent conversation if available
+        transaction_id = extract_txn_id(state.get("messages", []))
+        result = fetch_or_fallback(state.get("user_id", "demo_user"), transaction_id)
         
         return {
             "transaction": result,
@@ -69,117 +50,109 @@ class TransactionHelpWorkflow(BaseWorkflow):
     
     def get_summary_message(self, context: Dict[str, Any]) -> str:
         """Generate transaction summary message."""
-        transaction = context.get("transaction", {})
-        amount = abs(transaction.get("amount", 0))
-        currency = transaction.get("currency", "USD")
-        merchant = transaction.get("merchant", "merchant")
-        date = transaction.get("date", "")
-        
-        # Format date
-        from datetime import datetime
-        try:
-            date_obj = datetime.strptime(date, "%Y-%m-%d")
-            formatted_date = date_obj.strftime("%d %b %Y")
-        except:
-            formatted_date = date
-        
-        return f"Good news: your payment of {amount:.2f} {currency} to {merchant} on {formatted_date} was successful."
+        return format_summary(context.get("transaction", {}))
     
     def get_question(self, context: Dict[str, Any]) -> str:
         """Get the question to ask after summary."""
         return "Tell us what's wrong"
     
-    def get_suggestions(self, context: Dict[str, Any]) -> List[str]:
+    _SUGGESTIONS: ClassVar[Tuple[str, ...]] = (
+        "Receiver has not received the payment",
+        "Amount debited twice",
+        "Transaction failed",
+        "Need refund",
+        "Wrong amount charged",
+        "Offer not applied"
+    )
+    
+    def get_suggestions(self, context: Dict[str, Any]) -> Sequence[str]:
         """Get common transaction issue suggestions."""
-        return [
-            "Receiver has not received the payment",
-            "Amount debited twice",
-            "Transaction failed",
-            "Need refund",
-            "Wrong amount charged",
-            "Offer not applied"
-        ]
+        return self._SUGGESTIONS
+    
+    # Guide templates, keyed by issue; {merchant} and {reference} (the UTR) are
+    # filled in for the matched guide only
+    _GUIDES: ClassVar[Dict[str, ResolutionGuide]] = {
+        "receiver has not received the payment": ResolutionGuide(
+            message="We hate it when that happens too. Here's what you can do: contact {merchant} with UTR: {reference}. Only the merchant can initiate refunds.",
+            steps=(
+                "Contact {merchant} directly",
+                "Provide them with UTR: {reference}",
+                "Request payment confirmation or refund"
+            ),
+            reference="",
+            can_resolve=True
+        ),
+        "amount debited twice": ResolutionGuide(
+            message="Check if one transaction is still pending. If both are completed, contact {merchant} with UTR: {reference}.",
+            steps=(
+                "Check your transaction history for duplicate entries",
+                "Verify if one is still pending (will auto-reverse)",
+                "If both completed, contact {merchant} with UTR: {reference}"
+            ),
+            reference="",
+            can_resolve=True
+        ),
+        "transaction failed": ResolutionGuide(
+            message="This usually auto-reverses in 24-48 hours. If not, contact {merchant} with UTR: {reference}.",
+            steps=(
+                "Wait 24-48 hours for automatic reversal",
+                "If not reversed, contact {merchant} with UTR: {reference}",
+                "Provide transaction details for investigation"
+            ),
+            reference="",
+            can_resolve=True
+        ),
+        "need refund": ResolutionGuide(
+            message="Contact {merchant} directly with UTR: {reference} to request refund.",
+            steps=(
+                "Contact {merchant} customer support",
+                "Provide UTR: {reference}",
+                "Request refund with reason"
+            ),
+            reference="",
+            can_resolve=True
+        ),
+        "wrong amount charged": ResolutionGuide(
+            message="Contact {merchant} with UTR: {reference} to dispute the charge.",
+            steps=(
+                "Contact {merchant} billing department",
+                "Provide UTR: {reference} and correct amount",
+                "Request charge correction"
+            ),
+            reference="",
+            can_resolve=True
+        ),
+        "offer not applied": ResolutionGuide(
+            message="Contact {merchant} or check offer terms. UTR: {reference}",
+            steps=(
+                "Review offer terms and conditions",
+                "Contact {merchant} with UTR: {reference}",
+                "Verify eligibility and request credit"
+            ),
+            reference="",
+            can_resolve=True
+        ),
+    }
     
-    def get_resolution_guide(self, issue_type: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    _GUIDE_MATCHER: ClassVar[GuideMatcher] = GuideMatcher(list(_GUIDES))
+    
+    @staticmethod
+    def _format_dynamic(guide: ResolutionGuide, merchant: str, reference: str) -> Mapping[str, Any]:
+        """Fill the transaction's merchant and UTR into a guide template."""
+        return replace(
+            guide,
+            message=guide.message.format(merchant=merchant, reference=reference),
+            steps=tuple(step.format(merchant=merchant, reference=reference) for step in guide.steps),
+            reference=reference,
+        ).as_dict()
+    
+    def get_resolution_guide(self, issue_type: str, context: Dict[str, Any]) -> Mapping[str, Any]:
         """Get resolution guidance for transaction issues."""
         transaction = context.get("transaction", {})
         merchant = transaction.get("merchant", "the merchant")
         reference = transaction.get("reference", "")
         
-        guides = {
-            "receiver has not received the payment": {
-                "message": f"We hate it when that happens too. Here's what you can do: contact {merchant} with UTR: {reference}. Only the merchant can initiate refunds.",
-                "steps": [
-                    f"Contact {merchant} directly",
-                    f"Provide them with UTR: {reference}",
-                    "Request payment confirmation or refund"
-                ],
-                "reference": reference,
-                "can_resolve": True
-            },
-            "amount debited twice": {
-                "message": f"Check if one transaction is still pending. If both are completed, contact {merchant} with UTR: {reference}.",
-                "steps": [
-                    "Check your transaction history for duplicate entries",
-                    "Verify if one is still pending (will auto-reverse)",
-                    f"If both completed, contact {merchant} with UTR: {reference}"
-                ],
-                "reference": reference,
-                "can_resolve": True
-            },
-            "transaction failed": {
-                "message": f"This usually auto-reverses in 24-48 hours. If not, contact {merchant} with UTR: {reference}.",
-                "steps": [
-                    "Wait 24-48 hours for automatic reversal",
-                    f"If not reversed, contact {merchant} with UTR: {reference}",
-                    "Provide transaction details for investigation"
-                ],
-                "reference": reference,
-                "can_resolve": True
-            },
-            "need refund": {
-                "message": f"Contact {merchant} directly with UTR: {reference} to request refund.",
-                "steps": [
-                    f"Contact {merchant} customer support",
-                    f"Provide UTR: {reference}",
-                    "Request refund with reason"
-                ],
-                "reference": reference,
-                "can_resolve": True
-            },
-            "wrong amount charged": {
-                "message": f"Contact {merchant} with UTR: {reference} to dispute the charge.",
-                "steps": [
-                    f"Contact {merchant} billing department",
-                    f"Provide UTR: {reference} and correct amount",
-                    "Request charge correction"
-                ],
-                "reference": reference,
-                "can_resolve": True
-            },
-            "offer not applied": {
-                "message": f"Contact {merchant} or check offer terms. UTR: {reference}",
-                "steps": [
-                    "Review offer terms and conditions",
-                    f"Contact {merchant} with UTR: {reference}",
-                    "Verify eligibility and request credit"
-                ],
-                "reference": reference,
-                "can_resolve": True
-            }
-        }
-        
         # Find matching guide (case-insensitive)
-        issue_lower = issue_type.lower()
-        for key, guide in guides.items():
-            if key in issue_lower or issue_lower in key:
-                return guide
-        
-        # Default guide
-        return {
-            "message": f"Contact {merchant} with UTR: {reference} for assistance.",
-            "steps": [f"Contact {merchant} customer support", f"Provide UTR: {reference}"],
-            "reference": reference,
-            "can_resolve": True
-        }
-
+        key = self._GUIDE_MATCHER.match(issue_type.lower())
+        guide = _DEFAULT_TRANSACTION_GUIDE if key is None else self._GUIDES[key]
+        return self._format_dynamic(guide, merchant, reference)
@@ -7,9 +7,13 @@ without validation (trusting the mobile shell). Production should add
 JWKS validation and expiry enforcement.
 """
 
+from dataclasses import dataclass
 from typing import Optional
 from fastapi import Header, Request
 
+_BEARER_PREFIX = "Bearer "
+_BEARER_LEN = len(_BEARER_PREFIX)
+
 
 async def get_jwt_token(
     authorization: Optional[str] = Header(None, alias="Authorization")
@@ -27,29 +31,14 @@ async def get_jwt_token(
         return None
     
     # Handle "Bearer <token>" format
-    if authorization.startswith("Bearer "):
-        token = authorization.replace("Bearer ", "").strip()
+    if authorization.startswith(_BEARER_PREFIX):
+        token = authorization[_BEARER_LEN:].strip()
         if token:
             return token
     
     return None
 
 
-async def get_user_id(
-    x_user_id: Optional[str] = Header(None, alias="X-User-Id")
-) -> Optional[str]:
-    """
-    Extract user ID from X-User-Id header.
-    
-    Args:
-        x_user_id: X-User-Id header value
-        
-    Returns:
-        User ID string if present, None otherwise
-    """
-    return x_user_id if x_user_id else None
-
-
 def extract_jwt_from_request(request: Request) -> Optional[str]:
     """
     Extract JWT token from FastAPI request object.
@@ -63,9 +52,9 @@ def extract_jwt_from_request(request: Request) -> Optional[str]:
     Returns:
         JWT token string if present, None otherwise
     """
-    authorization = request.headers.get("Authorization") or request.headers.get("authorization")
-    if authorization and authorization.startswith("Bearer "):
-        return authorization.replace("Bearer ", "").strip()
+    authorization = request.headers.get("authorization")
+    if authorization and authorization.startswith(_BEARER_PREFIX):
+        return authorization[_BEARER_LEN:].strip() or None
     return None
 
 
@@ -79,7 +68,7 @@ def extract_user_id_from_request(request: Request) -> Optional[str]:
     Returns:
         User ID string if present, None otherwise
     """
-    return request.headers.get("X-User-Id") or request.headers.get("x-user-id")
+    return request.headers.get("x-user-id")
 
 
 def extract_sasai_token_from_request(request: Request) -> Optional[str]:
@@ -92,5 +81,46 @@ def extract_sasai_token_from_request(request: Request) -> Optional[str]:
     Returns:
         Sasai token string if present, None otherwise
     """
-    return request.headers.get("X-Sasai-Token") or request.headers.get("x-sasai-token")
+    return request.headers.get("x-sasai-token")
+
+
+@dataclass(slots=True)
+class RequestIdentity:
+    """Caller identity and preferences for one request, read from its headers once."""
+    jwt: Optional[str]
+    user_id: Optional[str]
+    sasai_token: Optional[str]
+    language: str = "en"
+
+
+def identity_from_request(request: Request, sasai_token: Optional[str] = None, language: str = "en") -> RequestIdentity:
+    """
+    Build the RequestIdentity for a request from its headers.
+    
+    Args:
+        request: FastAPI Request object
+        sasai_token: Token found elsewhere (e.g. the CopilotKit body); defaults to the header
+        language: Resolved language preference
+        
+    Returns:
+        RequestIdentity for the request
+    """
+    return RequestIdentity(
+        jwt=extract_jwt_from_request(request),
+        user_id=extract_user_id_from_request(request),
+        sasai_token=sasai_token or extract_sasai_token_from_request(request),
+        language=language,
+    )
+
 
+def get_identity(request: Request) -> RequestIdentity:
+    """
+    FastAPI dependency returning the request's RequestIdentity.
+    
+    SasaiTokenMiddleware stores it on request.state for agent requests; other
+    routes build it from the headers on first use.
+    """
+    identity = getattr(request.state, "identity", None)
+    if identity is None:
+        identity = request.state.identity = identity_from_request(request)
+    return identity
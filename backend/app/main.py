@@ -1,8 +1,13 @@
 from dotenv import load_dotenv
 load_dotenv()
 
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import Optional, List
+import anyio.to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from copilotkit.integrations.fastapi import add_fastapi_endpoint
@@ -12,10 +17,20 @@ from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
 import json
 
-from agent.graph import build_graph
-from app.sessions import router as sessions_router
-from app.auth import extract_sasai_token_from_request
+try:
+    import orjson
+    _json_loads = orjson.loads  # orjson.JSONDecodeError subclasses json.JSONDecodeError
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    _json_loads = json.loads
+
+from agent.graph import build_graph, _MONGO_CLIENT_KWARGS
+from agent.checkpointer import BatchingMongoDBSaver
+from app.sessions import (
+    router as sessions_router, create_sessions_client, ensure_sessions_indexes, backfill_session_previews,
+)
+from app.auth import extract_sasai_token_from_request, identity_from_request
 from app.context import sasai_token_context, language_context
+from utils.mcp_client_utils import close_mcp_session
 
 # Configure logging - reduce verbosity of CopilotKit SDK logs
 logging.basicConfig(
@@ -34,13 +49,75 @@ logger = logging.getLogger(__name__)
 # Set ROOT_PATH="/remittance-backend" if path rewrite isn't working
 ROOT_PATH = os.getenv("ROOT_PATH", "")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the agent on startup and release its resources on shutdown."""
+    # Size both thread pools to the Mongo connection pool: sync path operations
+    # and dependencies run on AnyIO's limiter (40 by default), while
+    # asyncio.to_thread and the checkpointer's run_in_executor calls use the
+    # loop's default executor. With at most one pooled connection per thread,
+    # blocking Mongo calls never queue for a connection while holding a thread.
+    worker_threads = int(os.getenv("WORKER_THREADS", _MONGO_CLIENT_KWARGS["maxPoolSize"]))
+    anyio.to_thread.current_default_thread_limiter().total_tokens = worker_threads
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=worker_threads, thread_name_prefix="worker")
+    )
+    
+    # Initialize graph with proper checkpointer once the worker starts, off the
+    # event loop, instead of at import time
+    # Uses environment-based configuration (USE_IN_MEMORY_DB flag)
+    # No runtime updates needed - restart required to change checkpointer type
+    graph = await asyncio.to_thread(build_graph)  # Calls get_checkpointer_sync() internally
+    sdk = CopilotKitRemoteEndpoint(
+        agents=[
+            LangGraphAgent(
+                name="remittance_agent",
+                description="Ecocash Relationship Manager",
+                graph=graph,
+            )
+        ],
+    )
+    app.state.graph = graph
+    app.state.sdk = sdk
+    # Pooled Mongo client shared by the sessions API (see app.sessions.get_checkpoints_collection)
+    app.state.mongo_client = create_sessions_client()
+    if app.state.mongo_client is not None:
+        try:
+            await ensure_sessions_indexes(app.state.mongo_client)
+        except Exception as e:
+            logger.warning("Could not create sessions index: %s", e)
+        # Threads written before previews were kept get one now, so listing
+        # from the previews collection is complete
+        if isinstance(graph.checkpointer, BatchingMongoDBSaver):
+            try:
+                await backfill_session_previews(app.state.mongo_client, graph.checkpointer.serde)
+            except Exception as e:
+                logger.warning("Could not backfill session previews: %s", e)
+    
+    # Register endpoint with properly initialized SDK
+    add_fastapi_endpoint(app, sdk, "/api/copilotkit")
+    logger.info("✅ CopilotKit endpoint registered at /api/copilotkit")
+    
+    try:
+        yield
+    finally:
+        # Close the pooled MCP client session and the sessions API's Mongo client
+        await close_mcp_session()
+        if app.state.mongo_client is not None:
+            await app.state.mongo_client.close()
+        # Write out any checkpoints still buffered by the batching saver
+        if isinstance(graph.checkpointer, BatchingMongoDBSaver):
+            await graph.checkpointer.aflush()
+
 app = FastAPI(
     title="Ecocash Assistant Backend",
-    root_path=ROOT_PATH  # Add root_path for reverse proxy support
+    root_path=ROOT_PATH,  # Add root_path for reverse proxy support
+    lifespan=lifespan,
 )
 
 # Configure CORS origins from environment variable
 # CORS_ORIGINS can be a comma-separated list of origins
+@lru_cache(maxsize=64)
 def normalize_origin(origin: str) -> str:
     """Normalize CORS origin by removing path components.
     
@@ -60,6 +137,7 @@ def normalize_origin(origin: str) -> str:
             return f"{protocol}://{domain_port}"
     return origin
 
+@lru_cache(maxsize=1)
 def get_cors_origins() -> List[str]:
     """Get CORS allowed origins from environment variable or use defaults."""
     # Default localhost origins for local development
@@ -80,16 +158,10 @@ def get_cors_origins() -> List[str]:
             for origin in cors_origins_env.split(",") 
             if origin.strip()
         ]
-        # Combine with default localhost origins for development
-        all_origins = default_origins + origins
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_origins = []
-        for origin in all_origins:
-            if origin not in seen:
-                seen.add(origin)
-                unique_origins.append(origin)
-        logger.info(f"CORS origins configured: {unique_origins}")
+        # Combine with default localhost origins for development,
+        # removing duplicates while preserving order
+        unique_origins = list(dict.fromkeys(default_origins + origins))
+        logger.info("CORS origins configured: %s", unique_origins)
         return unique_origins
     else:
         # Fallback to localhost only if no environment variable is set
@@ -105,32 +177,50 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+# Request bodies larger than this are parsed in a worker thread so a slow parse
+# does not stall other requests; above the hard cap the body is not parsed at
+# all and only header-based token/language extraction applies
+MAX_INLINE_PARSE = 16 * 1024
+MAX_BODY_PARSE = 256 * 1024
+
 # Middleware to extract Sasai token from request and store it in context for LangGraph
 class SasaiTokenMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
+        # Only agent requests need the token and language; CORS preflights,
+        # health checks and session endpoints pass straight through
+        path = request.url.path
+        if request.method == "OPTIONS" or "/api/copilotkit" not in path:
+            return await call_next(request)
+        
         sasai_token = None
         body_data = None
         
         # First try to extract from HTTP headers
-        logger.debug(f"[MIDDLEWARE] Checking for Sasai token in request to: {request.url.path}")
+        logger.debug("[MIDDLEWARE] Checking for Sasai token in request to: %s", path)
         sasai_token = extract_sasai_token_from_request(request)
         
         # If not in headers, try to extract from request body (CopilotKit properties)
         # CopilotKit sends properties in the request body, not as HTTP headers
-        if not sasai_token and request.method == "POST" and "/api/copilotkit" in request.url.path:
+        if not sasai_token and request.method == "POST":
             try:
-                # Read the body
+                # Read the body; BaseHTTPMiddleware keeps it cached and replays it
+                # to the endpoint, so it is neither re-read nor copied downstream
                 body_bytes = await request.body()
-                if body_bytes:
-                    body_data = json.loads(body_bytes)
+                if len(body_bytes) > MAX_BODY_PARSE:
+                    logger.warning("[MIDDLEWARE] Request body too large to inspect (%d bytes), using headers only", len(body_bytes))
+                elif body_bytes:
+                    if len(body_bytes) > MAX_INLINE_PARSE:
+                        body_data = await asyncio.to_thread(_json_loads, body_bytes)
+                    else:
+                        body_data = _json_loads(body_bytes)
                     
-                    # 🎯 LOG 1: Query from Frontend
-                    messages = body_data.get("messages", [])
+                    # 🎯 LOG 1: Query from Frontend (only looked up when INFO is enabled)
+                    messages = body_data.get("messages", []) if logger.isEnabledFor(logging.INFO) else None
                     if messages:
                         last_message = messages[-1]
                         if isinstance(last_message, dict) and last_message.get("role") == "user":
                             user_query = last_message.get("content", "")
-                            logger.info(f"🔵 [1/4] QUERY FROM FRONTEND: {user_query}")
+                            logger.info("🔵 [1/4] QUERY FROM FRONTEND: %s", user_query)
                     
                     properties = body_data.get("properties", {})
                     
@@ -144,30 +234,22 @@ class SasaiTokenMiddleware(BaseHTTPMiddleware):
                         sasai_token = metadata.get("external_token") or metadata.get("sasai_token") or metadata.get("sasaiToken")
                     
                     if sasai_token:
-                        logger.info(f"[MIDDLEWARE] ✅ Found Sasai token in request body properties (preview): {sasai_token[:20]}...")
-                    
-                    # Recreate request body stream for downstream handlers
-                    async def receive():
-                        return {"type": "http.request", "body": body_bytes}
-                    request._receive = receive
+                        logger.info("[MIDDLEWARE] ✅ Found Sasai token in request body properties (preview): %.20s...", sasai_token)
             except json.JSONDecodeError as e:
-                logger.debug(f"[MIDDLEWARE] Could not parse request body as JSON: {e}")
+                logger.debug("[MIDDLEWARE] Could not parse request body as JSON: %s", e)
             except Exception as e:
-                logger.debug(f"[MIDDLEWARE] Error reading request body: {type(e).__name__}: {e}", exc_info=True)
+                logger.debug("[MIDDLEWARE] Error reading request body: %s: %s", type(e).__name__, e, exc_info=True)
         
-        # Store token in context variable for LangGraph nodes to access
         if sasai_token:
-            sasai_token_context.set(sasai_token)
-            logger.info(f"[MIDDLEWARE] ✅ Stored Sasai token in context variable")
+            logger.info("[MIDDLEWARE] ✅ Found Sasai token for this request")
         else:
             logger.debug("[MIDDLEWARE] No Sasai token found - token manager will be used")
-            sasai_token_context.set(None)
         
         # Extract language preference from headers or metadata
         language = "en"  # Default to English
         
-        # Check X-Language header first
-        language_header = request.headers.get("X-Language") or request.headers.get("x-language")
+        # Check X-Language header first (Starlette header lookups are case-insensitive)
+        language_header = request.headers.get("x-language")
         if language_header and language_header in ["en", "sn"]:
             language = language_header
         elif body_data:
@@ -179,38 +261,31 @@ class SasaiTokenMiddleware(BaseHTTPMiddleware):
                 if lang_from_metadata and lang_from_metadata in ["en", "sn"]:
                     language = lang_from_metadata
             except Exception as e:
-                logger.debug(f"[MIDDLEWARE] Could not extract language from body: {e}")
+                logger.debug("[MIDDLEWARE] Could not extract language from body: %s", e)
         
-        # Store language in context variable
-        language_context.set(language)
-        logger.debug(f"[MIDDLEWARE] Language preference: {language}")
+        logger.debug("[MIDDLEWARE] Language preference: %s", language)
         
-        response = await call_next(request)
-        return response
+        # Request handlers read these from request.state.identity (see
+        # app.auth.get_identity); LangGraph nodes that don't get them through
+        # config fall back to the context variables, which are reset once the
+        # request is handed off so the tokens don't outlive it
+        # (left unset when they would only repeat the defaults)
+        request.state.identity = identity_from_request(request, sasai_token, language)
+        token_reset = sasai_token_context.set(sasai_token) if sasai_token else None
+        language_reset = language_context.set(language) if language != "en" else None
+        try:
+            return await call_next(request)
+        finally:
+            if language_reset is not None:
+                language_context.reset(language_reset)
+            if token_reset is not None:
+                sasai_token_context.reset(token_reset)
 
 app.add_middleware(SasaiTokenMiddleware)
 
 # Include sessions router
 app.include_router(sessions_router)
 
-# Initialize graph with proper checkpointer at module load
-# Uses environment-based configuration (USE_IN_MEMORY_DB flag)
-# No runtime updates needed - restart required to change checkpointer type
-graph = build_graph()  # Calls get_checkpointer_sync() internally
-sdk = CopilotKitRemoteEndpoint(
-    agents=[
-        LangGraphAgent(
-            name="remittance_agent",
-            description="Ecocash Relationship Manager",
-            graph=graph,
-        )
-    ],
-)
-
-# Register endpoint with properly initialized SDK
-add_fastapi_endpoint(app, sdk, "/api/copilotkit")
-logger.info("✅ CopilotKit endpoint registered at /api/copilotkit")
-
 @app.get("/")
 async def root():
     return {"message": "Ecocash Assistant Backend is running"}
@@ -3,20 +3,78 @@ Session management API endpoints.
 Queries sessions (threads) from the MongoDB checkpointer.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
+import asyncio
 import logging
 import os
+import re
 
-from agent.graph import get_checkpointer, build_graph
-from pymongo import MongoClient
+from agent.checkpointer import BatchingMongoDBSaver, _is_human, session_preview
+from agent.graph import get_checkpointer, _MONGO_CLIENT_KWARGS
+from agent.workflows._cache import TTLCache
+from langgraph.checkpoint.mongodb.utils import loads_metadata
+from pymongo import AsyncMongoClient, UpdateOne
+from pymongo.asynchronous.collection import AsyncCollection
 
 logger = logging.getLogger(__name__)
 
+
+def create_sessions_client() -> Optional[AsyncMongoClient]:
+    """Create the pooled async client for session queries (None if MONGODB_URI is not set).
+    
+    Created once in the app lifespan and stored on app.state; the driver
+    connects lazily, so this does not block.
+    """
+    mongodb_uri = os.getenv("MONGODB_URI")
+    return AsyncMongoClient(mongodb_uri, **_MONGO_CLIENT_KWARGS) if mongodb_uri else None
+
+
+def get_checkpoints_collection(request: Request) -> Optional[AsyncCollection]:
+    """Dependency: the checkpoints collection on the shared client (None if MongoDB is not configured)."""
+    client = getattr(request.app.state, "mongo_client", None)
+    if client is None:
+        return None
+    mongodb_db_name = os.getenv("MONGODB_DB_NAME", "remittance_assistant")
+    return client[mongodb_db_name]["checkpoints"]
+
+
+def get_sessions_collection(request: Request) -> Optional[AsyncCollection]:
+    """Dependency: the session previews collection written by BatchingMongoDBSaver (None if MongoDB is not configured)."""
+    client = getattr(request.app.state, "mongo_client", None)
+    if client is None:
+        return None
+    mongodb_db_name = os.getenv("MONGODB_DB_NAME", "remittance_assistant")
+    return client[mongodb_db_name]["sessions"]
+
+
+async def ensure_sessions_indexes(client: AsyncMongoClient):
+    """Create the indexes behind the sessions queries (a no-op if they already exist).
+    
+    Lets the list pipeline read each thread's latest checkpoint from the index
+    (DISTINCT_SCAN) instead of sorting the whole collection in memory, and
+    lets the previews collection be listed and upserted by index.
+    """
+    mongodb_db_name = os.getenv("MONGODB_DB_NAME", "remittance_assistant")
+    db = client[mongodb_db_name]
+    await db["checkpoints"].create_index(
+        [("checkpoint_ns", 1), ("thread_id", 1), ("checkpoint_id", -1)],
+        name="ns_thread_cp",
+    )
+    await db["sessions"].create_index("thread_id", unique=True, name="thread_id")
+    await db["sessions"].create_index([("updated_at", -1)], name="updated_at")
+
+
 router = APIRouter(prefix="/api/sessions", tags=["sessions"])
 
+# MongoDB session listings by (user_id, limit). Polling clients re-request the
+# same list every few seconds; new checkpoints show up once the entry expires,
+# deletes clear it immediately. Per process: each worker keeps its own cache.
+# Keys come from query parameters, so the cache is size-bounded.
+_sessions_cache = TTLCache(ttl=5, maxsize=1024)
+
 
 class SessionInfo(BaseModel):
     """Session information model."""
@@ -28,60 +86,159 @@ class SessionInfo(BaseModel):
     message_count: int = 0
 
 
+class BulkDelete(BaseModel):
+    """Request body for deleting several sessions at once."""
+    thread_ids: List[str]
+
+
+def _preview_from_row(row: dict, serde) -> Optional[dict]:
+    """Session preview fields from a thread's latest checkpoint row (None if it has no state).
+    
+    Runs in a worker thread: deserializing a whole conversation is CPU-bound.
+    """
+    # Deserialize the checkpoint with the checkpointer's own serializer
+    # (the same decoding aget_state does, without a query per thread)
+    checkpoint = serde.loads_typed((row["type"], row["checkpoint"]))
+    metadata = loads_metadata(row["metadata"]) if row.get("metadata") else {}
+    values = checkpoint.get("channel_values") or {}
+    
+    if not values:
+        return None
+    
+    # Same fields BatchingMongoDBSaver records for every new checkpoint
+    preview = session_preview(values.get("messages", []), metadata)
+    preview["updated_at"] = preview["created_at"] = datetime.fromisoformat(checkpoint["ts"])
+    return preview
+
+
+async def backfill_session_previews(client: AsyncMongoClient, serde) -> int:
+    """Record previews for threads last written before previews were kept.
+    
+    Run at startup. Only threads without a preview are read, so once every
+    thread has one this is a single scan of the checkpoint index. Previews the
+    checkpointer writes meanwhile win ($setOnInsert). Returns the number added.
+    """
+    mongodb_db_name = os.getenv("MONGODB_DB_NAME", "remittance_assistant")
+    db = client[mongodb_db_name]
+    collection = db["checkpoints"]
+    pipeline = [
+        {"$match": {"checkpoint_ns": ""}},
+        # Matches the ns_thread_cp index, so $group/$first can use a DISTINCT_SCAN
+        {"$sort": {"thread_id": 1, "checkpoint_id": -1}},
+        {"$group": {
+            "_id": "$thread_id",
+            "latest_checkpoint_id": {"$first": "$checkpoint_id"}
+        }},
+        # Threads that have no preview yet
+        {"$lookup": {
+            "from": "sessions",
+            "localField": "_id",
+            "foreignField": "thread_id",
+            "as": "preview"
+        }},
+        {"$match": {"preview": {"$size": 0}}},
+        # Checkpoint payloads are joined in only for those threads
+        {"$lookup": {
+            "from": collection.name,
+            "let": {"thread_id": "$_id", "checkpoint_id": "$latest_checkpoint_id"},
+            "pipeline": [
+                {"$match": {
+                    "checkpoint_ns": "",
+                    "$expr": {"$and": [
+                        {"$eq": ["$thread_id", "$$thread_id"]},
+                        {"$eq": ["$checkpoint_id", "$$checkpoint_id"]}
+                    ]}
+                }},
+                # Only the fields _preview_from_row reads
+                {"$project": {"_id": 0, "type": 1, "checkpoint": 1, "metadata": 1}}
+            ],
+            "as": "latest"
+        }},
+        {"$unwind": "$latest"},
+        {"$replaceRoot": {"newRoot": {"$mergeObjects": [{"_id": "$_id"}, "$latest"]}}}
+    ]
+    
+    cursor = await collection.aggregate(pipeline)
+    rows = [row for row in await cursor.to_list() if row.get("_id")]
+    if not rows:
+        return 0
+    
+    # Deserialize the threads concurrently in worker threads, off the event loop
+    results = await asyncio.gather(
+        *(asyncio.to_thread(_preview_from_row, row, serde) for row in rows),
+        return_exceptions=True,
+    )
+    
+    ops = []
+    for row, result in zip(rows, results):
+        thread_id = row["_id"]
+        if isinstance(result, Exception):
+            logger.warning(f"Failed to read latest checkpoint for thread {thread_id}: {result}")
+            # Fallback: list the session with minimal info
+            result = {"title": None, "last_message": None, "message_count": 0}
+        elif result is None:
+            continue
+        ops.append(UpdateOne(
+            {"thread_id": thread_id},
+            {"$setOnInsert": result},
+            upsert=True,
+        ))
+    
+    if ops:
+        await db["sessions"].bulk_write(ops, ordered=False)
+    logger.info(f"Backfilled {len(ops)} session preview(s)")
+    return len(ops)
+
+
 @router.get("/debug")
-async def debug_sessions():
+async def debug_sessions(collection: Optional[AsyncCollection] = Depends(get_checkpoints_collection)):
     """Debug endpoint to check database state."""
     try:
-        mongodb_uri = os.getenv("MONGODB_URI")
-        mongodb_db_name = os.getenv("MONGODB_DB_NAME", "remittance_assistant")
-        
-        if not mongodb_uri:
+        if collection is None:
             return {"error": "MONGODB_URI not set"}
         
-        client = MongoClient(mongodb_uri)
-        db = client[mongodb_db_name]
-        collection = db["checkpoints"]
+        # Get all unique thread IDs
+        thread_ids = await collection.distinct("thread_id", {"checkpoint_ns": ""})
         
-        try:
-            # Get all unique thread IDs (pymongo is synchronous)
-            thread_ids = collection.distinct("thread_id", {"checkpoint_ns": ""})
-            
-            # Get total checkpoint count (pymongo is synchronous)
-            total = collection.count_documents({"checkpoint_ns": ""})
-            
-            # Get latest checkpoint
-            latest = collection.find_one(
-                {"checkpoint_ns": ""},
-                sort=[("checkpoint_id", -1)]
-            )
-            
-            latest_info = None
-            if latest:
-                latest_info = {
-                    "thread_id": latest.get("thread_id"),
-                    "checkpoint_id": str(latest.get("checkpoint_id", "")),
-                    "timestamp": latest.get("checkpoint", {}).get("ts") if isinstance(latest.get("checkpoint"), dict) else None
-                }
-            
-            return {
-                "total_checkpoints": total,
-                "unique_thread_ids": len(thread_ids),
-                "thread_ids": thread_ids,
-                "latest_checkpoint": latest_info
+        # Get total checkpoint count
+        total = await collection.count_documents({"checkpoint_ns": ""})
+        
+        # Get latest checkpoint
+        latest = await collection.find_one(
+            {"checkpoint_ns": ""},
+            sort=[("checkpoint_id", -1)]
+        )
+        
+        latest_info = None
+        if latest:
+            latest_info = {
+                "thread_id": latest.get("thread_id"),
+                "checkpoint_id": str(latest.get("checkpoint_id", "")),
+                "timestamp": latest.get("checkpoint", {}).get("ts") if isinstance(latest.get("checkpoint"), dict) else None
             }
-        finally:
-            client.close()
+        
+        return {
+            "total_checkpoints": total,
+            "unique_thread_ids": len(thread_ids),
+            "thread_ids": thread_ids,
+            "latest_checkpoint": latest_info
+        }
     except Exception as e:
         return {"error": str(e)}
 
 
 @router.get("/", response_model=List[SessionInfo])
-async def list_sessions(user_id: Optional[str] = None, limit: int = 50):
+async def list_sessions(
+    user_id: Optional[str] = None,
+    limit: int = 50,
+    collection: Optional[AsyncCollection] = Depends(get_checkpoints_collection),
+    sessions_collection: Optional[AsyncCollection] = Depends(get_sessions_collection),
+):
     """
     List all sessions (threads) from the checkpointer.
     
-    For MongoDB checkpointer, we query the database directly to get unique thread IDs
-    and their latest checkpoints.
+    For MongoDB checkpointer, we read the per-thread previews the checkpointer
+    keeps in the sessions collection.
     
     Args:
         user_id: Optional user ID to filter sessions (for multi-user support)
@@ -107,146 +264,34 @@ async def list_sessions(user_id: Optional[str] = None, limit: int = 50):
         
         # For MongoDB checkpointer, query the database directly
         if is_mongodb:
-            mongodb_uri = os.getenv("MONGODB_URI")
-            mongodb_db_name = os.getenv("MONGODB_DB_NAME", "remittance_assistant")
-            
-            if not mongodb_uri:
+            if collection is None:
                 logger.warning("MONGODB_URI not set, cannot query sessions")
                 return []
             
-            # Connect to MongoDB (using synchronous pymongo for direct queries)
-            client = MongoClient(mongodb_uri)
-            db = client[mongodb_db_name]
-            collection = db["checkpoints"]
+            cache_key = (user_id, limit)
+            cached = _sessions_cache.get(cache_key)
+            if cached is not None:
+                return cached
             
-            try:
-                # Get unique thread IDs with their latest checkpoint_id using aggregation
-                # This ensures we get all sessions, ordered by most recent checkpoint
-                pipeline = [
-                    {"$match": {"checkpoint_ns": ""}},
-                    {"$sort": {"checkpoint_id": -1}},
-                    {"$group": {
-                        "_id": "$thread_id",
-                        "latest_checkpoint_id": {"$first": "$checkpoint_id"}
-                    }},
-                    {"$sort": {"latest_checkpoint_id": -1}},
-                    {"$limit": limit}
-                ]
-                
-                # pymongo aggregation is synchronous
-                thread_rows = list(collection.aggregate(pipeline))
-                print(f"[SESSIONS] Found {len(thread_rows)} unique thread IDs in database")
-                
-                # Build graph to use aget_state() for proper deserialization
-                graph = build_graph(checkpointer=checkpointer)
-                
-                sessions = []
-                for row in thread_rows:
-                    # MongoDB aggregation uses _id for grouped field
-                    thread_id = row.get('_id')
-                    if not thread_id:
-                        continue
-                    
-                    # Filter by user_id if provided
-                    if user_id and user_id not in thread_id:
-                        continue
-                    
-                    try:
-                        # Use graph.aget_state() to get properly deserialized state
-                        # This handles version 3.0.1+ checkpoint structure correctly
-                        config = {"configurable": {"thread_id": thread_id}}
-                        state = await graph.aget_state(config)
-                        
-                        if not state or not state.values:
-                            continue
-                        
-                        # Extract messages from state (properly deserialized)
-                        messages = state.values.get("messages", [])
-                        
-                        # Extract last message
-                        last_message = None
-                        if messages:
-                            last_msg = messages[-1]
-                            if hasattr(last_msg, 'content'):
-                                last_message = str(last_msg.content)[:100]
-                            elif isinstance(last_msg, dict):
-                                last_message = str(last_msg.get('content', ''))[:100]
-                        
-                        # Extract title from metadata or first message
-                        title = state.metadata.get("title") if state.metadata else None
-                        if not title and messages:
-                            # Find first user message (HumanMessage)
-                            first_user_msg = None
-                            for m in messages:
-                                # Check for HumanMessage type or role='user'
-                                if hasattr(m, 'type') and m.type == 'human':
-                                    first_user_msg = m
-                                    break
-                                elif hasattr(m, 'role') and m.role == 'user':
-                                    first_user_msg = m
-                                    break
-                                elif isinstance(m, dict) and m.get('role') == 'user':
-                                    first_user_msg = m
-                                    break
-                                # Also check for HumanMessage class name
-                                elif 'HumanMessage' in str(type(m)):
-                                    first_user_msg = m
-                                    break
-                            
-                            if first_user_msg:
-                                content = None
-                                if hasattr(first_user_msg, 'content'):
-                                    content = str(first_user_msg.content)
-                                elif isinstance(first_user_msg, dict):
-                                    content = str(first_user_msg.get('content', ''))
-                                
-                                if content:
-                                    # Clean and truncate title
-                                    title = content.replace('\n', ' ').strip()[:50]
-                                    if len(content) > 50:
-                                        title = title.rsplit(' ', 1)[0] + '...'  # Don't cut words
-                        
-                        # Get timestamps from metadata
-                        created_at = None
-                        if state.metadata:
-                            created_at_raw = state.metadata.get("created_at")
-                            if created_at_raw:
-                                if isinstance(created_at_raw, str):
-                                    try:
-                                        created_at = datetime.fromisoformat(created_at_raw.replace('Z', '+00:00'))
-                                    except:
-                                        created_at = None
-                                elif isinstance(created_at_raw, datetime):
-                                    created_at = created_at_raw
-                        
-                        sessions.append(SessionInfo(
-                            thread_id=thread_id,
-                            title=title or f"Session {thread_id[:8]}",
-                            created_at=created_at,
-                            updated_at=created_at,
-                            last_message=last_message,
-                            message_count=len(messages)
-                        ))
-                    except Exception as e:
-                        logger.warning(f"Failed to get state for thread {thread_id}: {e}")
-                        # Fallback: create session with minimal info
-                        sessions.append(SessionInfo(
-                            thread_id=thread_id,
-                            title=f"Session {thread_id[:8]}",
-                            created_at=None,
-                            updated_at=None,
-                            last_message=None,
-                            message_count=0
-                        ))
-                
-                # Sort by updated_at (most recent first)
-                sessions.sort(key=lambda x: x.updated_at or datetime.min, reverse=True)
-                
-                print(f"[SESSIONS] Returning {len(sessions)} sessions")
-                return sessions[:limit]
+            # Session previews are upserted next to each checkpoint, so listing is
+            # one indexed find with no checkpoint deserialization
+            query = {"thread_id": {"$regex": re.escape(user_id)}} if user_id else {}
+            cursor = sessions_collection.find(query, {"_id": 0}).sort("updated_at", -1).limit(limit)
+            sessions = [
+                SessionInfo(
+                    thread_id=row["thread_id"],
+                    title=row.get("title") or f"Session {row['thread_id'][:8]}",
+                    created_at=row.get("created_at"),
+                    updated_at=row.get("updated_at"),
+                    last_message=row.get("last_message"),
+                    message_count=row.get("message_count", 0)
+                )
+                for row in await cursor.to_list()
+            ]
             
-            finally:
-                client.close()
+            print(f"[SESSIONS] Returning {len(sessions)} sessions")
+            _sessions_cache.set(cache_key, sessions)
+            return sessions
         
         # Fallback: Try using checkpointer's list method (for MemorySaver or other checkpointers)
         if hasattr(checkpointer, 'alist'):
@@ -284,7 +329,7 @@ async def list_sessions(user_id: Optional[str] = None, limit: int = 50):
                 
                 title = checkpoint.metadata.get("title")
                 if not title and messages:
-                    first_user_msg = next((m for m in messages if hasattr(m, 'role') and m.role == 'user'), None)
+                    first_user_msg = next((m for m in messages if _is_human(m)), None)
                     if first_user_msg and hasattr(first_user_msg, 'content'):
                         title = str(first_user_msg.content)[:50]
                 
@@ -312,13 +357,12 @@ async def list_sessions(user_id: Optional[str] = None, limit: int = 50):
 
 
 @router.get("/{thread_id}", response_model=SessionInfo)
-async def get_session(thread_id: str):
+async def get_session(thread_id: str, request: Request):
     """Get a specific session by thread ID."""
     try:
-        checkpointer = await get_checkpointer()
-        
-        # Build graph with checkpointer to get state
-        graph = build_graph(checkpointer=checkpointer)
+        # The app graph compiled in the lifespan shares the process-wide
+        # checkpointer, so no per-request compile is needed
+        graph = request.app.state.graph
         
         # Get the latest state for this thread
         config = {"configurable": {"thread_id": thread_id}}
@@ -339,7 +383,7 @@ async def get_session(thread_id: str):
         metadata = state.metadata if state.metadata else {}
         title = metadata.get("title")
         if not title and messages:
-            first_user_msg = next((m for m in messages if hasattr(m, 'role') and m.role == 'user'), None)
+            first_user_msg = next((m for m in messages if _is_human(m)), None)
             if first_user_msg and hasattr(first_user_msg, 'content'):
                 title = str(first_user_msg.content)[:50]
         
@@ -360,7 +404,11 @@ async def get_session(thread_id: str):
 
 
 @router.delete("/{thread_id}")
-async def delete_session(thread_id: str):
+async def delete_session(
+    thread_id: str,
+    collection: Optional[AsyncCollection] = Depends(get_checkpoints_collection),
+    sessions_collection: Optional[AsyncCollection] = Depends(get_sessions_collection),
+):
     """Delete a session (thread) from the checkpointer by deleting all checkpoints for that thread."""
     try:
         checkpointer = await get_checkpointer()
@@ -371,32 +419,29 @@ async def delete_session(thread_id: str):
         
         if is_mongodb:
             # Delete from MongoDB database directly
-            mongodb_uri = os.getenv("MONGODB_URI")
-            mongodb_db_name = os.getenv("MONGODB_DB_NAME", "remittance_assistant")
-            
-            if not mongodb_uri:
+            if collection is None:
                 raise HTTPException(status_code=500, detail="MONGODB_URI not configured")
             
-            client = MongoClient(mongodb_uri)
-            db = client[mongodb_db_name]
-            collection = db["checkpoints"]
+            # Write out buffered checkpoints first, so a later flush cannot
+            # re-create the thread (or its preview) after the delete
+            if isinstance(checkpointer, BatchingMongoDBSaver):
+                await checkpointer.aflush()
             
-            try:
-                # Delete all checkpoints for this thread_id (pymongo is synchronous)
-                result = collection.delete_many({
-                    "thread_id": thread_id,
-                    "checkpoint_ns": ""
-                })
-                deleted_count = result.deleted_count
-                
-                logger.info(f"Deleted {deleted_count} checkpoints for thread_id: {thread_id}")
-                return {
-                    "message": "Session deleted successfully",
-                    "thread_id": thread_id,
-                    "deleted_checkpoints": deleted_count
-                }
-            finally:
-                client.close()
+            # Delete all checkpoints for this thread_id
+            result = await collection.delete_many({
+                "thread_id": thread_id,
+                "checkpoint_ns": ""
+            })
+            deleted_count = result.deleted_count
+            await sessions_collection.delete_one({"thread_id": thread_id})
+            _sessions_cache.clear()
+            
+            logger.info(f"Deleted {deleted_count} checkpoints for thread_id: {thread_id}")
+            return {
+                "message": "Session deleted successfully",
+                "thread_id": thread_id,
+                "deleted_checkpoints": deleted_count
+            }
         else:
             # For MemorySaver, we can't delete (it's in-memory)
             logger.warning(f"Delete not supported for {checkpointer_type} checkpointer")
@@ -411,3 +456,53 @@ async def delete_session(thread_id: str):
         logger.error(f"Failed to delete session {thread_id}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to delete session: {str(e)}")
 
+
+@router.post("/bulk-delete")
+async def bulk_delete_sessions(
+    req: BulkDelete,
+    collection: Optional[AsyncCollection] = Depends(get_checkpoints_collection),
+    sessions_collection: Optional[AsyncCollection] = Depends(get_sessions_collection),
+):
+    """Delete several sessions with one delete_many per collection instead of a request per thread."""
+    try:
+        checkpointer = await get_checkpointer()
+        
+        checkpointer_type = type(checkpointer).__name__
+        is_mongodb = 'MongoDB' in checkpointer_type or 'mongodb' in str(type(checkpointer)).lower()
+        
+        if not is_mongodb:
+            logger.warning(f"Delete not supported for {checkpointer_type} checkpointer")
+            return {
+                "message": "Delete not supported for in-memory checkpointer",
+                "thread_ids": req.thread_ids
+            }
+        
+        if collection is None:
+            raise HTTPException(status_code=500, detail="MONGODB_URI not configured")
+        
+        # Write out buffered checkpoints first, so a later flush cannot
+        # re-create the threads (or their previews) after the delete
+        if isinstance(checkpointer, BatchingMongoDBSaver):
+            await checkpointer.aflush()
+        
+        thread_ids = list(dict.fromkeys(req.thread_ids))
+        result = await collection.delete_many({
+            "thread_id": {"$in": thread_ids},
+            "checkpoint_ns": ""
+        })
+        deleted_count = result.deleted_count
+        await sessions_collection.delete_many({"thread_id": {"$in": thread_ids}})
+        _sessions_cache.clear()
+        
+        logger.info(f"Deleted {deleted_count} checkpoints for {len(thread_ids)} thread(s)")
+        return {
+            "message": "Sessions deleted successfully",
+            "thread_ids": thread_ids,
+            "deleted_checkpoints": deleted_count
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to delete sessions: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to delete sessions: {str(e)}")
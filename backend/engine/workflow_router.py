@@ -3,7 +3,7 @@
 from typing import Optional, Dict, Any
 from langchain_core.runnables import RunnableConfig
 from engine.state import AgentState
-from agent.workflows import detect_workflow, get_workflow
+from agent.workflows import detect_workflow, get_workflow_instance
 
 
 async def route_to_workflow(state: AgentState, config: RunnableConfig) -> Optional[Dict[str, Any]]:
@@ -27,13 +27,12 @@ async def route_to_workflow(state: AgentState, config: RunnableConfig) -> Option
     if not workflow_name:
         return None
     
-    # Get workflow class
-    workflow_class = get_workflow(workflow_name)
-    if not workflow_class:
+    # Get the shared workflow instance
+    workflow = get_workflow_instance(workflow_name)
+    if not workflow:
         return None
     
-    # Create workflow instance and get context
-    workflow = workflow_class()
+    # Get context
     context = await workflow.summarize(state, config)
     
     return {
@@ -1,36 +1,192 @@
-
 import os
+import asyncio
+import traceback
+from datetime import timedelta
+from typing import Any, Dict, Optional
+import anyio
+from anyio import BrokenResourceError, ClosedResourceError, EndOfStream
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.sse import sse_client
+from mcp.shared.exceptions import McpError
+from mcp.shared.session import ProgressFnT
+from mcp.types import CONNECTION_CLOSED
 from langchain_mcp_adapters.tools import load_mcp_tools
 import logging
 
 logger = logging.getLogger(__name__)
 
+# MCP server URL and per-request read timeout, read once at import time (see refresh_env())
+MCP_URL = os.getenv("MCP_SERVER_URL", "http://localhost:8001/mcp")
+MCP_READ_TIMEOUT = timedelta(seconds=float(os.getenv("MCP_READ_TIMEOUT_SECONDS", "60")))
+
+# Long-lived MCP session shared by every graph invocation.
+# The SSE stream and ClientSession are owned by a background task so their
+# async context managers are entered and exited in the same task.
+_mcp_session: Optional[ClientSession] = None
+_mcp_task: Optional[asyncio.Task] = None
+_mcp_stop: Optional[asyncio.Event] = None
+_mcp_lock = asyncio.Lock()
+
+# Errors that mean the pooled SSE connection is gone and must be re-established
+_DISCONNECT_ERRORS = (ConnectionError, ClosedResourceError, BrokenResourceError, EndOfStream)
+
+
+def _is_disconnect(e: BaseException) -> bool:
+    """True if e means the pooled connection is gone (including the session's "Connection closed" McpError)."""
+    if isinstance(e, _DISCONNECT_ERRORS):
+        return True
+    return isinstance(e, McpError) and e.error.code == CONNECTION_CLOSED
+
+
+def refresh_env():
+    """Re-read MCP settings from the environment (the pooled session keeps its settings until reset)."""
+    global MCP_URL, MCP_READ_TIMEOUT
+    MCP_URL = os.getenv("MCP_SERVER_URL", "http://localhost:8001/mcp")
+    MCP_READ_TIMEOUT = timedelta(seconds=float(os.getenv("MCP_READ_TIMEOUT_SECONDS", "60")))
+
+
+async def _forward_until_closed(read, writer, stop: asyncio.Event):
+    """Relay the SSE read stream to the session; when it ends, stop the session runner."""
+    try:
+        async with writer:
+            async for message in read:
+                await writer.send(message)
+        logger.warning("Pooled MCP session disconnected: SSE stream closed")
+    except Exception as e:
+        logger.warning("Pooled MCP session disconnected: %s: %s", type(e).__name__, e)
+    finally:
+        stop.set()
+
+
+async def _run_mcp_session(mcp_url: str, read_timeout: timedelta, ready: asyncio.Future, stop: asyncio.Event):
+    """
+    Open the SSE connection, initialize the session and keep it open until
+    stopped or until the server's stream closes.
+    """
+    try:
+        async with sse_client(mcp_url) as (read, write):
+            # The session reads through a relay so a dropped stream ends this
+            # task, which makes get_mcp_session() reconnect on next use
+            writer, reader = anyio.create_memory_object_stream(0)
+            relay = asyncio.create_task(_forward_until_closed(read, writer, stop))
+            try:
+                async with ClientSession(reader, write, read_timeout_seconds=read_timeout) as session:
+                    await session.initialize()
+                    ready.set_result(session)
+                    await stop.wait()
+            finally:
+                relay.cancel()
+    except Exception as e:
+        # Surface connect failures to the waiting caller; later disconnects just
+        # end the task, which makes get_mcp_session() reconnect on next use.
+        if not ready.done():
+            ready.set_exception(e)
+        else:
+            logger.warning("Pooled MCP session disconnected: %s: %s", type(e).__name__, e)
+
+
+async def get_mcp_session() -> ClientSession:
+    """
+    Get the pooled MCP client session, connecting on first use.
+    Reconnects transparently if the previous connection has dropped.
+    """
+    global _mcp_session, _mcp_task, _mcp_stop
+
+    async with _mcp_lock:
+        if _mcp_session is not None and not _mcp_stop.is_set() and not _mcp_task.done():
+            return _mcp_session
+
+        mcp_url = MCP_URL
+        logger.info("Opening pooled MCP session to: %s", mcp_url)
+
+        ready = asyncio.get_running_loop().create_future()
+        stop = asyncio.Event()
+        task = asyncio.create_task(_run_mcp_session(mcp_url, MCP_READ_TIMEOUT, ready, stop))
+        try:
+            session = await ready
+        except BaseException:
+            stop.set()
+            _mcp_session = _mcp_task = _mcp_stop = None
+            raise
+
+        _mcp_session, _mcp_task, _mcp_stop = session, task, stop
+        return session
+
+
+async def reset_mcp_session(failed_session: Optional[ClientSession] = None):
+    """
+    Drop the pooled session so the next caller reconnects.
+    With failed_session, only if it is still the pooled one: a concurrent
+    caller may already have replaced it with a working session.
+    """
+    global _mcp_session, _mcp_task, _mcp_stop
+
+    async with _mcp_lock:
+        if failed_session is not None and _mcp_session is not failed_session:
+            return
+        task, stop = _mcp_task, _mcp_stop
+        _mcp_session = _mcp_task = _mcp_stop = None
+
+    if task is None:
+        return
+    if stop is not None:
+        stop.set()
+    await task
+
+
+async def close_mcp_session():
+    """Close the pooled MCP session. Called on application shutdown."""
+    await reset_mcp_session()
+    logger.info("Pooled MCP session closed")
+
+
+async def call_mcp_tool(
+    tool_name: str,
+    arguments: Optional[Dict[str, Any]] = None,
+    progress_callback: Optional[ProgressFnT] = None,
+    retry: bool = False,
+):
+    """
+    Call a tool over the pooled MCP session.
+    If the connection drops during the call, the session is dropped so the
+    next call reconnects. With retry=True the call is re-sent once on a new
+    session; only pass it for idempotent tools, since the server may already
+    have processed the first call.
+
+    MCP tool results arrive as a single response; progress_callback receives
+    the server's progress notifications while the call is in flight.
+    """
+    session = await get_mcp_session()
+    try:
+        return await session.call_tool(tool_name, arguments=arguments, progress_callback=progress_callback)
+    except Exception as e:
+        if not _is_disconnect(e):
+            raise
+        await reset_mcp_session(session)
+        if not retry:
+            logger.warning("MCP connection lost during %s (%s), not retrying", tool_name, type(e).__name__)
+            raise
+        logger.warning("MCP connection lost during %s (%s), reconnecting", tool_name, type(e).__name__)
+        session = await get_mcp_session()
+        return await session.call_tool(tool_name, arguments=arguments, progress_callback=progress_callback)
+
+
 async def get_mcp_tools():
     """
-    Connect to the MCP server and load available tools.
+    Load available tools from the MCP server over the pooled session.
     Returns a list of LangChain compatible tools.
+    The session is connected and initialized once, so per-turn calls only pay
+    for the tool listing, not the SSE handshake and initialize round-trip.
     """
-    mcp_url = os.getenv("MCP_SERVER_URL", "http://localhost:8001/mcp")
-    
     try:
-        logger.info(f"Attempting to connect to MCP server at: {mcp_url}")
-        async with sse_client(mcp_url) as (read, write):
-            logger.info("SSE client connection established")
-            async with ClientSession(read, write) as session:
-                logger.info("Initializing MCP session...")
-                await session.initialize()
-                logger.info("Loading MCP tools...")
-                # Load tools from MCP server
-                # This returns a list of LangChain tools that are bound to this session
-                # Note: These tools will fail if executed after session closes,
-                # but we only need them for binding to the LLM (getting schemas).
-                tools = await load_mcp_tools(session)
-                logger.info(f"Successfully loaded {len(tools)} MCP tools")
-                return tools
+        session = await get_mcp_session()
+        logger.info("Loading MCP tools...")
+        # Load tools from MCP server
+        # These tools are bound to the pooled session, which stays open
+        tools = await load_mcp_tools(session)
+        logger.info("Successfully loaded %d MCP tools", len(tools))
+        return tools
     except Exception as e:
-        logger.error(f"Failed to load MCP tools: {e}", exc_info=True)
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Failed to load MCP tools: %s", e, exc_info=True)
+        logger.error("Traceback: %s", traceback.format_exc())
         return []